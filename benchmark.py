@@ -0,0 +1,104 @@
+"""Micro-benchmarks for the sheet processing hot paths
+
+Usage:
+    python benchmark.py generate_schema [--sizes 1000 10000 100000]
+    python benchmark.py clean_data_for_sql [--sizes 10000 100000 1000000]
+"""
+import argparse
+import logging
+import time
+import numpy as np
+import pandas as pd
+from excel import EXPECTED_COLUMNS
+
+def make_dictionary_frame(rows, seed=0):
+    """Build a synthetic data dictionary sheet with the given number of column rows"""
+    rng = np.random.default_rng(seed)
+    types = np.array(['int', 'nvarchar', 'nchar', 'decimal', 'datetime', 'bit'], dtype=object)
+    type_col = types[rng.integers(0, len(types), rows)]
+    lengths = np.where(np.isin(type_col, ['nvarchar', 'nchar', 'decimal']),
+                       rng.integers(1, 250, rows), np.nan)
+    df = pd.DataFrame({
+        'Back': np.nan,
+        'Key': np.where(np.arange(rows) == 0, 'PK', None),
+        'No': np.arange(1, rows + 1),
+        'Name': [f"Col_{i}" for i in range(rows)],
+        'Nul': rng.choice(['Y', 'N'], rows),
+        'Type': type_col,
+        'Len': lengths,
+        'Dec': np.where(type_col == 'decimal', 2, np.nan),
+        'Und': np.nan,
+        'Def': np.where(type_col == 'bit', 'Y', None),
+        'Desc': [f"Description {i}" for i in range(rows)],
+        'Note': np.nan,
+        'TableCode': np.where(np.arange(rows) == 0, 'BENCH01', None),
+        'TableName': np.where(np.arange(rows) == 0, 'bench_table', None),
+        'TableDesc': np.where(np.arange(rows) == 0, 'Benchmark table', None),
+        'TableNote': np.nan,
+    })
+    return df[EXPECTED_COLUMNS]
+
+def make_data_frame(rows, seed=0):
+    """Build a synthetic reference-data table to be inserted into SQL Server"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows, dtype='float64')
+    ids[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        'Id': ids,
+        'Amount': rng.random(rows) * 1000,
+        'Code': rng.integers(0, 100, rows).astype('float64'),
+        'Name': rng.choice(['alpha', 'beta', None], rows),
+    })
+
+def time_call(func, *args, repeat=3):
+    """Return the best wall-clock time of func(*args) over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def report_scaling(name, func, sizes, make_frame=make_dictionary_frame):
+    """Time func over frames of increasing size and print the per-row cost
+
+    A flat per-row cost across sizes means the function scales linearly.
+    """
+    print(f"{name}")
+    per_row = []
+    for rows in sizes:
+        df = make_frame(rows)
+        seconds = time_call(lambda: func(df.copy()))
+        per_row.append(seconds / rows)
+        print(f"  {rows:>8} rows: {seconds:8.4f}s  ({per_row[-1] * 1e6:.2f} us/row)")
+    print(f"  per-row cost ratio largest/smallest: {per_row[-1] / per_row[0]:.2f}")
+
+def bench_generate_schema(sizes):
+    from validation import generate_schema
+    report_scaling("generate_schema", generate_schema, sizes)
+
+def bench_clean_data_for_sql(sizes):
+    from validation import clean_data_for_sql
+    report_scaling("clean_data_for_sql", clean_data_for_sql, sizes, make_frame=make_data_frame)
+
+BENCHMARKS = {
+    'generate_schema': bench_generate_schema,
+    'clean_data_for_sql': bench_clean_data_for_sql,
+}
+
+DEFAULT_SIZES = {
+    'clean_data_for_sql': [10000, 100000, 1000000],
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--sizes', type=int, nargs='+')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    sizes = args.sizes or DEFAULT_SIZES.get(args.benchmark, [1000, 10000, 100000])
+    BENCHMARKS[args.benchmark](sizes)
+
+if __name__ == "__main__":
+    main()
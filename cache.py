@@ -0,0 +1,97 @@
+import os
+import logging
+import pandas as pd
+
+class SheetCache:
+    """Disk cache of cleaned sheet DataFrames keyed by a content hash
+
+    Entries are pickled DataFrames named ``<key>.pkl``. A hit refreshes the
+    file's mtime, so ``evict`` can drop the least recently used entries once
+    the directory grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """Return the cached DataFrame for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            df = pd.read_pickle(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return df
+
+    def put(self, key, df):
+        """Store df under key; call evict() once a batch of puts is done"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f"Could not write cache entry {path}: {e}")
+            self._remove(tmp_path)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.pkl'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                removed += 1
+        if removed:
+            logging.info(f"Evicted {removed} sheet cache entries")
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+def open_sheet_cache(config):
+    """Return a SheetCache for config, or None when caching is disabled"""
+    if not config.get('cache_enabled', True) or config.get('no_cache'):
+        return None
+    cache_dir = config.get('cache_dir')
+    if not cache_dir:
+        from config_manager import ConfigManager
+        cache_dir = ConfigManager().get_cache_dir()
+    max_mb = config.get('cache_max_mb', 256)
+    return SheetCache(cache_dir, max_bytes=int(max_mb * 1024 * 1024))
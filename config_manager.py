@@ -5,6 +5,9 @@ import sys
 from pathlib import Path
 
 class ConfigManager:
+    # Keys set from command line flags for a single run; never written to config.json
+    RUNTIME_KEYS = ('no_cache', 'force')
+
     def __init__(self, app_name="ExcelToSchemas"):
         self.app_name = app_name
         self.config_dir = self._get_config_dir()
@@ -38,13 +41,31 @@ class ConfigManager:
                 "server": "",
                 "database": "",
                 "username": "",
-                "password": ""
+                "password": "",
+                "pool_size": 5,
+                "pool_idle_timeout": 300
             },
             "file_path": "",
             "batch_size": 1000,
+            "fast_executemany": True,
+            "load_strategy": "executemany",
+            "bulk_stage_dir": "",
             "timeout": 30,
             "retry_attempts": 3,
+            "ddl_concurrency": 1,
+            "ddl_mode": "statement",
+            "ddl_batch_max_chars": 262144,
+            "fingerprints_enabled": True,
+            "pipeline": False,
+            "pipeline_queue_depth": 2,
             "log_level": "INFO",
+            "log_display_lines": 1000,
+            "log_max_bytes": 5242880,
+            "log_backup_count": 5,
+            "excel_reader": "pandas",
+            "workers": 1,
+            "cache_enabled": True,
+            "cache_max_mb": 256,
             "selected_sheets": [],
             "export_type": "database"
         }
@@ -77,6 +98,7 @@ class ConfigManager:
     def save_config(self, config_data):
         """Save configuration to file"""
         try:
+            config_data = {k: v for k, v in config_data.items() if k not in self.RUNTIME_KEYS}
             with open(self.config_file, 'w') as f:
                 json.dump(config_data, f, indent=4)
             logging.info(f"Configuration saved to {self.config_file}")
@@ -90,3 +112,9 @@ class ConfigManager:
         logs_dir = os.path.join(self.config_dir, 'logs')
         os.makedirs(logs_dir, exist_ok=True)
         return logs_dir
+
+    def get_cache_dir(self):
+        """Get the sheet cache directory path"""
+        cache_dir = os.path.join(self.config_dir, 'cache')
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
@@ -1,65 +1,262 @@
 import pyodbc
+import atexit
 import logging
+import os
+import tempfile
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from validation import error_handling_wrapper
 
+# Pool settings stored in the database config block; not part of the connection string
+POOL_OPTION_KEYS = ('pool_size', 'pool_idle_timeout')
+
+def _open_connection(db_config):
+    logging.info(f"Attempting to connect to SQL Server at {db_config['server']} with user {db_config['username']}")
+    connection = pyodbc.connect(
+        f"DRIVER={{{db_config['driver']}}};"
+        f"SERVER={db_config['server']};"
+        f"DATABASE={db_config['database']};"
+        f"UID={db_config['username']};"
+        f"PWD={db_config['password']};"
+        "Timeout=30;"
+    )
+    logging.info("Connection successful!")
+    return connection
+
+class PooledConnection:
+    """Wrapper around a pooled pyodbc connection; close() returns it to the pool"""
+
+    def __init__(self, pool, connection):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_connection', connection)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self._pool.release(self._connection)
+            object.__setattr__(self, '_connection', None)
+
+class ConnectionPool:
+    """Thread-safe pool of pyodbc connections for a single db_config
+
+    Idle connections older than idle_timeout seconds are closed, reused
+    connections are validated with SELECT 1 before checkout, and at most
+    max_size connections are open at once.
+    """
+
+    def __init__(self, db_config, max_size=5, idle_timeout=300):
+        self.db_config = db_config
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._condition = threading.Condition()
+        self._idle = []  # (connection, last_used) pairs, most recent last
+        self._open = 0
+        self.metrics = {
+            'created': 0,
+            'checkouts': 0,
+            'returns': 0,
+            'discarded': 0,
+            'ping_failures': 0,
+            'waits': 0,
+        }
+
+    def acquire(self, retry_attempts=1, timeout=30):
+        """Check out a connection, waiting up to timeout seconds if the pool is full"""
+        deadline = time.monotonic() + timeout
+        while True:
+            connection = None
+            with self._condition:
+                while not self._idle and self._open >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No pooled connection available after {timeout}s")
+                    self.metrics['waits'] += 1
+                    self._condition.wait(remaining)
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    if time.monotonic() - last_used > self.idle_timeout:
+                        self._discard_locked(connection)
+                        continue
+                else:
+                    self._open += 1
+
+            if connection is None:
+                try:
+                    connection = self._connect(retry_attempts)
+                except Exception:
+                    with self._condition:
+                        self._open -= 1
+                        self._condition.notify()
+                    raise
+            elif not self._ping(connection):
+                with self._condition:
+                    self.metrics['ping_failures'] += 1
+                    self._discard_locked(connection)
+                continue
+
+            with self._condition:
+                self.metrics['checkouts'] += 1
+            return PooledConnection(self, connection)
+
+    def release(self, connection):
+        """Return a checked out connection to the pool"""
+        try:
+            # Drop uncommitted work and restore pyodbc's default state
+            connection.rollback()
+            connection.autocommit = False
+        except pyodbc.Error:
+            with self._condition:
+                self._discard_locked(connection)
+                self._condition.notify()
+            return
+        with self._condition:
+            self.metrics['returns'] += 1
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._condition:
+            while self._idle:
+                connection, _ = self._idle.pop()
+                self._discard_locked(connection)
+
+    def stats(self):
+        with self._condition:
+            return dict(self.metrics, open=self._open, idle=len(self._idle),
+                        in_use=self._open - len(self._idle))
+
+    def _connect(self, retry_attempts):
+        attempts = max(1, retry_attempts)
+        for attempt in range(1, attempts + 1):
+            try:
+                connection = _open_connection(self.db_config)
+                with self._condition:
+                    self.metrics['created'] += 1
+                return connection
+            except pyodbc.Error as e:
+                if attempt == attempts:
+                    raise
+                delay = min(2 ** (attempt - 1), 10)
+                logging.warning(f"Connection attempt {attempt}/{attempts} failed: {e}. Retrying in {delay}s")
+                time.sleep(delay)
+
+    def _ping(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1").fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error as e:
+            logging.info(f"Discarding stale pooled connection: {e}")
+            return False
+
+    def _discard_locked(self, connection):
+        self._open -= 1
+        self.metrics['discarded'] += 1
+        try:
+            connection.close()
+        except pyodbc.Error:
+            pass
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_config):
+    """Return the shared ConnectionPool for db_config, creating it on first use"""
+    key = tuple(sorted((k, str(v)) for k, v in db_config.items() if k not in POOL_OPTION_KEYS))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                dict(db_config),
+                max_size=int(db_config.get('pool_size') or 5),
+                idle_timeout=float(db_config.get('pool_idle_timeout') or 300)
+            )
+            _pools[key] = pool
+        return pool
+
+def close_all_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            logging.debug(f"Connection pool stats: {pool.stats()}")
+            pool.close_all()
+
+atexit.register(close_all_pools)
+
 @error_handling_wrapper
-def connect_to_database(db_config):
+def connect_to_database(db_config, retry_attempts=1):
+    """Check out a pooled connection for db_config
+
+    Call close() on the returned connection to hand it back to the pool.
+    """
     try:
-        logging.info(f"Attempting to connect to SQL Server at {db_config['server']} with user {db_config['username']}")
-        connection = pyodbc.connect(
-            f"DRIVER={{{db_config['driver']}}};"
-            f"SERVER={db_config['server']};"
-            f"DATABASE={db_config['database']};"
-            f"UID={db_config['username']};"
-            f"PWD={db_config['password']};"
-            "Timeout=30;"
-        )
-        logging.info("Connection successful!")
-        return connection
-    except pyodbc.Error as e:
+        return get_pool(db_config).acquire(retry_attempts=retry_attempts)
+    except (pyodbc.Error, TimeoutError) as e:
         logging.error(f"Database connection error: {e}")
         return None
 
-@error_handling_wrapper
-def create_sql_table(connection, table_name, schema, table_info):
-    cursor = connection.cursor()
-    
-    table_name = table_name.replace(' ', '_')
-    
-    drop_table_query = f"IF OBJECT_ID('{table_name}', 'U') IS NOT NULL DROP TABLE {table_name}"
-    cursor.execute(drop_table_query)
-    
-    safe_schema = {}
-    for col, dtype in schema.items():
-        if col.lower() in ["dec", "und", "name", "nul", "len", "def", "desc"]:
-            col = col + "_col"
-        safe_schema[col] = dtype
+# Column names that clash with dictionary headers get a _col suffix
+RESERVED_COLUMN_NAMES = ["dec", "und", "name", "nul", "len", "def", "desc"]
 
-    columns = [f"[{col}] {dtype}" for col, dtype in safe_schema.items()]
+def _safe_column_name(col):
+    if col.lower() in RESERVED_COLUMN_NAMES:
+        return col + "_col"
+    return col
+
+def _sql_string(value):
+    """Quote value as an N'...' literal, doubling embedded quotes"""
+    return "N'" + str(value).replace("'", "''") + "'"
+
+def build_create_table_query(table_name, spec):
+    columns = [f"[{_safe_column_name(col)}] {dtype}" for col, dtype in spec.definitions().items()]
     
-    if table_info and table_info.get('primary_keys'):
-        pk_cols = [f"[{col}]" for col in table_info['primary_keys']]
+    if spec.primary_keys:
+        pk_cols = [f"[{col}]" for col in spec.primary_keys]
         if pk_cols:
             pk_constraint = f"CONSTRAINT [PK_{table_name}] PRIMARY KEY ({','.join(pk_cols)})"
             columns.append(pk_constraint)
     
-    create_table_query = (
+    return (
         f"""CREATE TABLE {table_name} (
             {','.join(columns)}
         );"""
     )
+
+@error_handling_wrapper
+def create_sql_table(connection, table_name, spec):
+    cursor = connection.cursor()
+    
+    table_name = table_name.replace(' ', '_')
+    
+    drop_table_query = f"IF OBJECT_ID('{table_name}', 'U') IS NOT NULL DROP TABLE {table_name}"
+    cursor.execute(drop_table_query)
+    
+    create_table_query = build_create_table_query(table_name, spec)
     
     logging.info(f"Creating table with query: {create_table_query}")
     cursor.execute(create_table_query)
     
-    if table_info and table_info.get('description'):
+    if spec.description:
         try:
             desc_query = f"""
             EXEC sp_addextendedproperty 
             @name = N'MS_Description',
-            @value = N'{table_info['description']}',
+            @value = N'{spec.description}',
             @level0type = N'SCHEMA', @level0name = 'dbo',
             @level1type = N'TABLE', @level1name = N'{table_name}'
             """
@@ -69,12 +266,560 @@ def create_sql_table(connection, table_name, schema, table_info):
     
     connection.commit()
     logging.info(f"Table '{table_name}' created successfully!")
+    return True
+
+def compile_table_ddl(table_name, spec):
+    """Compile the whole deployment of one table into a single T-SQL batch
+
+    The batch drops and recreates the table and adds the MS_Description
+    property for the table and for every column that has a description.
+    """
+    table_name = table_name.replace(' ', '_')
+    statements = [
+        f"IF OBJECT_ID('{table_name}', 'U') IS NOT NULL DROP TABLE {table_name};",
+        build_create_table_query(table_name, spec),
+    ]
+    if spec.description:
+        statements.append(
+            "EXEC sp_addextendedproperty @name = N'MS_Description', "
+            f"@value = {_sql_string(spec.description)}, "
+            f"@level0type = N'SCHEMA', @level0name = 'dbo', "
+            f"@level1type = N'TABLE', @level1name = {_sql_string(table_name)};"
+        )
+    for col, description in spec.column_descriptions.items():
+        statements.append(
+            "EXEC sp_addextendedproperty @name = N'MS_Description', "
+            f"@value = {_sql_string(description)}, "
+            f"@level0type = N'SCHEMA', @level0name = 'dbo', "
+            f"@level1type = N'TABLE', @level1name = {_sql_string(table_name)}, "
+            f"@level2type = N'COLUMN', @level2name = {_sql_string(_safe_column_name(col))};"
+        )
+    return '\n'.join(statements)
+
+@error_handling_wrapper
+def execute_ddl_batch(connection, batch_sql, table_names):
+    """Send a compiled DDL batch in one execute call and commit it"""
+    cursor = connection.cursor()
+    logging.info(f"Deploying {len(table_names)} table(s) in one batch: {', '.join(table_names)}")
+    cursor.execute(batch_sql)
+    # Drain the result sets so every statement in the batch runs
+    while cursor.nextset():
+        pass
+    connection.commit()
+    return True
+
+def group_ddl_batches(items, max_chars):
+    """Split (result, ddl) pairs into batches whose DDL stays under max_chars
+
+    Returns (group, batch_sql) pairs. A single table larger than max_chars
+    still gets a batch of its own.
+    """
+    groups = []
+    current, parts, size = [], [], 0
+    for result, ddl in items:
+        if current and size + len(ddl) > max_chars:
+            groups.append((current, '\n'.join(parts)))
+            current, parts, size = [], [], 0
+        current.append(result)
+        parts.append(ddl)
+        size += len(ddl) + 1
+    if current:
+        groups.append((current, '\n'.join(parts)))
+    return groups
+
+def fetch_live_catalog(connection, table_names):
+    """Read columns and MS_Description properties of table_names in one query
+
+    Returns {table: {'columns': {column: {...}}, 'description': str|None}}
+    for the tables that exist in the dbo schema. Table names are matched
+    by the server's (usually case-insensitive) collation, so the keys are
+    lower-cased; look tables up with name.lower().
+    """
+    if not table_names:
+        return {}
+    names = ', '.join(_sql_string(name) for name in table_names)
+    query = f"""
+    SELECT c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE, c.CHARACTER_MAXIMUM_LENGTH,
+           c.NUMERIC_PRECISION, c.NUMERIC_SCALE, c.IS_NULLABLE,
+           CAST(ep.value AS NVARCHAR(4000)),
+           CASE WHEN EXISTS (
+               SELECT 1 FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc
+               JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE k
+                   ON k.CONSTRAINT_SCHEMA = tc.CONSTRAINT_SCHEMA AND k.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
+               WHERE tc.CONSTRAINT_TYPE = 'PRIMARY KEY' AND tc.TABLE_SCHEMA = c.TABLE_SCHEMA
+                   AND tc.TABLE_NAME = c.TABLE_NAME AND k.COLUMN_NAME = c.COLUMN_NAME
+           ) THEN 1 ELSE 0 END
+    FROM INFORMATION_SCHEMA.COLUMNS c
+    LEFT JOIN sys.extended_properties ep
+        ON ep.class = 1 AND ep.name = N'MS_Description'
+        AND ep.major_id = OBJECT_ID(QUOTENAME(c.TABLE_SCHEMA) + '.' + QUOTENAME(c.TABLE_NAME))
+        AND ep.minor_id = COLUMNPROPERTY(ep.major_id, c.COLUMN_NAME, 'ColumnId')
+    WHERE c.TABLE_SCHEMA = 'dbo' AND c.TABLE_NAME IN ({names})
+    UNION ALL
+    SELECT OBJECT_NAME(ep.major_id), NULL, NULL, NULL, NULL, NULL, NULL,
+           CAST(ep.value AS NVARCHAR(4000)), 0
+    FROM sys.extended_properties ep
+    WHERE ep.class = 1 AND ep.minor_id = 0 AND ep.name = N'MS_Description'
+        AND OBJECT_SCHEMA_NAME(ep.major_id) = 'dbo' AND OBJECT_NAME(ep.major_id) IN ({names})
+    """
+    cursor = connection.cursor()
+    cursor.execute(query)
+    catalog = {}
+    for (table, column, data_type, max_length, precision, scale, nullable,
+         description, primary_key) in cursor.fetchall():
+        entry = catalog.setdefault(table.lower(), {'columns': {}, 'description': None})
+        if column is None:
+            entry['description'] = description
+            continue
+        entry['columns'][column] = {
+            'type': data_type.upper(),
+            'length': max_length,
+            'precision': precision,
+            'scale': scale,
+            'nullable': nullable == 'YES',
+            'description': description,
+            'primary_key': bool(primary_key),
+        }
+    return catalog
+
+def _column_matches(column, live):
+    """True when a ColumnSpec matches a live catalog column"""
+    data_type, size, scale = column.sql_type()
+    if data_type != live['type'] or column.sql_nullable != live['nullable']:
+        return False
+    if data_type in ('NVARCHAR', 'VARCHAR', 'NCHAR', 'CHAR'):
+        return live['length'] == (-1 if size == 'MAX' else size)
+    if data_type == 'DECIMAL':
+        return (live['precision'], live['scale']) == (size, scale)
+    return True
+
+def _description_ddl(description, current, table_name, column=None):
+    """sp_add/sp_updateextendedproperty call, or None if nothing changes"""
+    if not description or str(description) == current:
+        return None
+    procedure = 'sp_updateextendedproperty' if current is not None else 'sp_addextendedproperty'
+    sql = (
+        f"EXEC {procedure} @name = N'MS_Description', "
+        f"@value = {_sql_string(description)}, "
+        f"@level0type = N'SCHEMA', @level0name = 'dbo', "
+        f"@level1type = N'TABLE', @level1name = {_sql_string(table_name)}"
+    )
+    if column is not None:
+        sql += f", @level2type = N'COLUMN', @level2name = {_sql_string(column)}"
+    return sql + ";"
+
+def diff_table_ddl(table_name, spec, live):
+    """Compile the DDL that brings a live table in line with spec
+
+    live is the table's entry from fetch_live_catalog, or None when the
+    table does not exist yet (the full CREATE is returned). Columns are
+    only added or altered, never dropped, and an unchanged table yields an
+    empty string. ALTER COLUMN cannot change a DEFAULT, so defaults are
+    only applied to added columns.
+
+    Changes that would fail on a populated table are reported instead:
+    a NOT NULL column without a Def is added as NULL, and primary key
+    columns (which PK_<table> depends on) are never altered.
+
+    Returns (ddl, complete); complete is False when such a change was
+    left out, so the table does not fully match spec after the DDL runs.
+    """
+    table_name = table_name.replace(' ', '_')
+    if live is None:
+        return compile_table_ddl(table_name, spec), True
+
+    live_columns = {name.lower(): column for name, column in live['columns'].items()}
+    columns = spec.columns_by_name()
+    descriptions = spec.column_descriptions
+    statements = []
+    complete = True
+    for col, column in columns.items():
+        safe_col = _safe_column_name(col)
+        current = live_columns.get(safe_col.lower())
+        if current is None:
+            definition = column.definition()
+            if not column.sql_nullable and column.default is None:
+                # Existing rows would have no value for the column (error 4901)
+                definition = column.definition(nullable=True)
+                complete = False
+                logging.warning(
+                    f"Table '{table_name}': adding [{safe_col}] as NULL; "
+                    "set NOT NULL once existing rows have values, or give it a Def"
+                )
+            statements.append(f"ALTER TABLE {table_name} ADD [{safe_col}] {definition};")
+        elif not _column_matches(column, current):
+            if current.get('primary_key'):
+                complete = False
+                logging.warning(
+                    f"Table '{table_name}': [{safe_col}] differs from the sheet but is part of "
+                    "the primary key; not altered. Redeploy the table to change it"
+                )
+            else:
+                statements.append(
+                    f"ALTER TABLE {table_name} ALTER COLUMN [{safe_col}] "
+                    f"{column.definition(with_default=False)};"
+                )
+        property_sql = _description_ddl(
+            descriptions.get(col), current['description'] if current else None, table_name, safe_col
+        )
+        if property_sql:
+            statements.append(property_sql)
+
+    property_sql = _description_ddl(spec.description, live['description'], table_name)
+    if property_sql:
+        statements.append(property_sql)
+
+    extra = set(live_columns) - {_safe_column_name(col).lower() for col in columns}
+    if extra:
+        logging.info(f"Table '{table_name}' keeps columns not in the sheet: {', '.join(sorted(extra))}")
+    return '\n'.join(statements), complete
+
+@error_handling_wrapper
+def plan_incremental_deploy(db_config, results, retry_attempts=1):
+    """Diff every result against the live catalog using a single query
+
+    Returns {id(result): (ddl, complete)} as from diff_table_ddl, with an
+    empty ddl for tables that are already up to date, or None if the
+    catalog could not be read.
+    """
+    connection = connect_to_database(db_config, retry_attempts=retry_attempts)
+    if not connection:
+        return None
+    try:
+        table_names = [r['table_name'].replace(' ', '_') for r in results]
+        catalog = fetch_live_catalog(connection, table_names)
+    finally:
+        connection.close()
+    return {
+        id(r): diff_table_ddl(r['table_name'], r['spec'], catalog.get(name.lower()))
+        for r, name in zip(results, table_names)
+    }
+
+def order_by_dependencies(results):
+    """Group sheet results into waves that can be deployed concurrently
+
+    A table whose foreign key column is the primary key of another table in
+    the run is placed in a later wave than that table. Tables caught in a
+    reference cycle are deployed together in the last wave.
+    """
+    owners = {}
+    for result in results:
+        for pk in result['spec'].primary_keys:
+            owners.setdefault(pk, set()).add(result['table_name'])
+    # A key name declared by several tables (e.g. ID) does not say which one is referenced
+    owners = {pk: tables.pop() for pk, tables in owners.items() if len(tables) == 1}
+
+    pending = {}
+    for result in results:
+        pending[result['table_name']] = {
+            owners[fk] for fk in result['spec'].foreign_keys if fk in owners and owners[fk] != result['table_name']
+        }
+
+    waves = []
+    remaining = list(results)
+    done = set()
+    while remaining:
+        wave = [r for r in remaining if pending[r['table_name']] <= done]
+        if not wave:
+            logging.warning(
+                "Circular foreign key references between: "
+                + ", ".join(r['table_name'] for r in remaining)
+            )
+            wave = remaining
+        waves.append(wave)
+        done.update(r['table_name'] for r in wave)
+        remaining = [r for r in remaining if r['table_name'] not in done]
+    return waves
+
+def check_connection(db_config, retry_attempts=1):
+    """Check out one connection (with retries) and raise ConnectionError if that fails
+
+    Callers that deploy many tables check once up front and then connect
+    per table without retries, so a bad server fails the run immediately
+    instead of backing off for every table.
+    """
+    connection = connect_to_database(db_config, retry_attempts=retry_attempts)
+    if not connection:
+        raise ConnectionError("Failed to connect to database")
+    connection.close()
+
+def cap_concurrency(db_config, concurrency):
+    """Limit concurrency to the size of db_config's pool
+
+    Extra workers would only wait in ConnectionPool.acquire, and time out
+    there while a slow batch holds every connection.
+    """
+    concurrency = max(1, int(concurrency or 1))
+    pool_size = get_pool(db_config).max_size
+    if concurrency > pool_size:
+        logging.info(f"Limiting DDL concurrency to {pool_size} (pool_size)")
+        return pool_size
+    return concurrency
+
+def _outcome(result, status, seconds=0.0, error=None, complete=True):
+    return {'table': result['table_name'], 'sheet': result['sheet_name'],
+            'status': status, 'seconds': seconds, 'error': error, 'complete': complete}
+
+def is_deployed(outcome):
+    """True when the table now fully matches its sheet, so its fingerprint can be stored"""
+    return outcome['status'] in ('created', 'unchanged') and outcome['complete']
+
+def _deploy_group(db_config, group, batch_sql, retry_attempts, cancel_event=None):
+    """Deploy one unit of work: a single table, or a compiled batch of tables"""
+    if cancel_event is not None and cancel_event.is_set():
+        return [_outcome(r, 'cancelled') for r in group]
+    start = time.time()
+    connection = connect_to_database(db_config, retry_attempts=retry_attempts)
+    if not connection:
+        return [_outcome(r, 'failed', time.time() - start, "Failed to connect to database")
+                for r in group]
+    try:
+        if batch_sql is None:
+            result = group[0]
+            created = create_sql_table(connection, result['table_name'], result['spec'])
+        else:
+            created = execute_ddl_batch(connection, batch_sql, [r['table_name'] for r in group])
+    finally:
+        connection.close()
+    seconds = time.time() - start
+    return [_outcome(r, 'created', seconds) if created
+            else _outcome(r, 'failed', seconds, "See log for details")
+            for r in group]
+
+def deploy_table(db_config, result, retry_attempts=1, ddl_mode='statement', cancel_event=None):
+    """Deploy a single result on a pooled connection and return its summary dict
+
+    Used by callers that deploy tables as they are produced instead of
+    all at once; see deploy_tables for the ddl_mode values.
+    """
+    if ddl_mode == 'incremental':
+        plan = plan_incremental_deploy(db_config, [result], retry_attempts=retry_attempts)
+        if plan is None:
+            return _outcome(result, 'failed', error="Could not read the database catalog")
+        ddl, complete = plan[id(result)]
+        if not ddl:
+            return _outcome(result, 'unchanged', complete=complete)
+        outcome = _deploy_group(db_config, [result], ddl, retry_attempts, cancel_event)[0]
+        outcome['complete'] = complete
+        return outcome
+    batch_sql = None
+    if ddl_mode == 'batched':
+        batch_sql = compile_table_ddl(result['table_name'], result['spec'])
+    return _deploy_group(db_config, [result], batch_sql, retry_attempts, cancel_event)[0]
+
+def deploy_tables(results, db_config, concurrency=1, retry_attempts=1,
+                  ddl_mode='statement', batch_max_chars=262144,
+                  fingerprints=None, force=False, cancel_event=None):
+    """Deploy every result on up to concurrency pooled connections
+
+    Tables are deployed wave by wave (see order_by_dependencies); work in
+    the same wave runs in parallel, on at most pool_size connections. With ddl_mode='batched' each table's DDL
+    and column descriptions are compiled into one statement and tables of a
+    wave are grouped into batches of up to batch_max_chars, so a batch costs
+    a single round trip. ddl_mode='incremental' sends only the changes
+    found by diffing the live catalog (see diff_table_ddl), one table per
+    batch so a failing ALTER only rolls back its own table, and reports
+    tables without changes as 'unchanged'.
+
+    When a FingerprintStore is given, tables whose fingerprint matches the
+    last successful deploy to this server/database are reported as
+    'skipped' without touching the database, unless force is set. Tables
+    that diff_table_ddl could only partly update (complete=False in their
+    summary) are not fingerprinted, so the next run diffs them again.
+    Once cancel_event is set, work that has not started is reported as
+    'cancelled'. Raises ConnectionError when the database cannot be reached
+    at all. Returns one summary dict per table, in the order of results.
+    """
+    concurrency = cap_concurrency(db_config, concurrency)
+    outcomes = {}
+    table_fingerprints = {}
+    if fingerprints is not None:
+        target = fingerprints.target_key(db_config)
+        for r in results:
+            fp = fingerprints.fingerprint(r['spec'])
+            table_fingerprints[id(r)] = fp
+            if not force and fingerprints.get(target, r['table_name']) == fp:
+                outcomes[id(r)] = _outcome(r, 'skipped')
+    pending = [r for r in results if id(r) not in outcomes]
+    if pending:
+        check_connection(db_config, retry_attempts)
+        # The server is reachable; a failed connect below is not worth a retry backoff
+        retry_attempts = 1
+
+    plan = None
+    if ddl_mode == 'incremental' and pending:
+        plan = plan_incremental_deploy(db_config, pending, retry_attempts=retry_attempts)
+        if plan is None:
+            for r in pending:
+                outcomes[id(r)] = _outcome(r, 'failed', error="Could not read the database catalog")
+            pending = []
+        else:
+            for r in pending:
+                ddl, complete = plan[id(r)]
+                if not ddl:
+                    outcomes[id(r)] = _outcome(r, 'unchanged', complete=complete)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for wave in order_by_dependencies(pending):
+            if plan is not None:
+                units = [([r], plan[id(r)][0]) for r in wave if plan[id(r)][0]]
+            elif ddl_mode == 'batched':
+                units = group_ddl_batches(
+                    [(r, compile_table_ddl(r['table_name'], r['spec'])) for r in wave],
+                    batch_max_chars
+                )
+            else:
+                units = [([result], None) for result in wave]
+            for (group, _), group_outcomes in zip(units, executor.map(
+                    lambda unit: _deploy_group(db_config, unit[0], unit[1], retry_attempts, cancel_event),
+                    units)):
+                for result, outcome in zip(group, group_outcomes):
+                    if plan is not None:
+                        outcome['complete'] = plan[id(result)][1]
+                    outcomes[id(result)] = outcome
+
+    if fingerprints is not None:
+        fingerprints.record(target, [
+            (r['table_name'], table_fingerprints[id(r)]) for r in pending
+            if is_deployed(outcomes[id(r)])
+        ])
+    return [outcomes[id(r)] for r in results]
+
+def log_deploy_summary(summary):
+    created = [s for s in summary if s['status'] == 'created']
+    unchanged = [s for s in summary if s['status'] == 'unchanged']
+    skipped = [s for s in summary if s['status'] == 'skipped']
+    failed = [s for s in summary if s['status'] == 'failed']
+    cancelled = [s for s in summary if s['status'] == 'cancelled']
+    partial = [s for s in summary if s['status'] in ('created', 'unchanged') and not s['complete']]
+    for item in summary:
+        logging.info(f"  {item['table']} ({item['sheet']}): {item['status']} in {item['seconds']:.2f}s")
+    logging.info(
+        f"Deployed {len(created)}/{len(summary)} tables, "
+        f"{len(unchanged)} unchanged, {len(failed)} failed"
+    )
+    if partial:
+        logging.warning(
+            f"{len(partial)} tables still differ from their sheets (see warnings above): "
+            + ", ".join(s['table'] for s in partial)
+        )
+    if cancelled:
+        logging.warning(f"Cancelled before deploying {len(cancelled)} tables")
+    if summary:
+        logging.info(
+            f"Skipped {len(skipped)}/{len(summary)} tables with unchanged fingerprints "
+            f"({len(skipped) / len(summary):.0%})"
+        )
+    return not (failed or cancelled)
+
+LOAD_STRATEGIES = ('executemany', 'bulk_insert', 'tvp')
+
+def _csv_field(value):
+    """Format one value for BULK INSERT ... FORMAT = 'CSV' with KEEPNULLS
+
+    None becomes an empty field (NULL) while strings are always quoted, so
+    an empty string loads as '' instead of NULL.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+def _create_bulk_stage(cursor, table_name, columns):
+    """Create an empty temp table with df's columns, typed like the target table
+
+    BULK INSERT matches fields by position, so batches are loaded into this
+    table and copied into the target with an explicit column list, as the
+    other strategies do.
+    """
+    stage_name = f"#bulk_{uuid.uuid4().hex}"
+    column_list = ", ".join(f"[{col}]" for col in columns)
+    cursor.execute(f"SELECT TOP 0 {column_list} INTO [{stage_name}] FROM [dbo].[{table_name}]")
+    return stage_name
+
+def _bulk_insert_batch(cursor, table_name, stage_name, columns, rows, stage_dir):
+    """Stage rows to a UTF-8 CSV file, BULK INSERT it into stage_name and copy to table_name
+
+    The file must be readable by the SQL Server service, so stage_dir has to
+    be local to the server or a share it can reach.
+    """
+    fd, stage_path = tempfile.mkstemp(prefix=f"{table_name}_", suffix='.csv', dir=stage_dir)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.writelines(','.join(_csv_field(v) for v in row) + '\n' for row in rows)
+        escaped_path = stage_path.replace("'", "''")
+        cursor.execute(
+            f"BULK INSERT [{stage_name}] FROM '{escaped_path}' "
+            "WITH (FORMAT = 'CSV', FIELDQUOTE = '\"', CODEPAGE = '65001', "
+            "ROWTERMINATOR = '0x0a', KEEPNULLS, KEEPIDENTITY, TABLOCK)"
+        )
+        column_list = ", ".join(f"[{col}]" for col in columns)
+        cursor.execute(
+            f"INSERT INTO [{table_name}] ({column_list}) SELECT {column_list} FROM [{stage_name}]"
+        )
+        cursor.execute(f"TRUNCATE TABLE [{stage_name}]")
+    finally:
+        try:
+            os.remove(stage_path)
+        except OSError:
+            pass
+
+def _create_staging_type(cursor, table_name, columns):
+    """Create a table type matching the target table's columns for TVP loads
+
+    Each load gets its own type name, so concurrent loads into the same
+    table do not drop each other's type.
+    """
+    type_name = f"tvp_{table_name[:80]}_{uuid.uuid4().hex}"
+    cursor.execute(
+        "SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, "
+        "NUMERIC_SCALE, DATETIME_PRECISION FROM INFORMATION_SCHEMA.COLUMNS "
+        "WHERE TABLE_SCHEMA = 'dbo' AND TABLE_NAME = ? ORDER BY ORDINAL_POSITION",
+        table_name
+    )
+    catalog = {row[0]: row[1:] for row in cursor.fetchall()}
+    definitions = []
+    for col in columns:
+        if col not in catalog:
+            raise ValueError(f"Column '{col}' not found in table '{table_name}'")
+        data_type, char_length, precision, scale, datetime_precision = catalog[col]
+        if data_type in ('char', 'varchar', 'nchar', 'nvarchar', 'binary', 'varbinary'):
+            data_type = f"{data_type}({'MAX' if char_length == -1 else char_length})"
+        elif data_type in ('decimal', 'numeric'):
+            data_type = f"{data_type}({precision},{scale})"
+        elif data_type in ('datetime2', 'datetimeoffset', 'time'):
+            data_type = f"{data_type}({datetime_precision})"
+        definitions.append(f"[{col}] {data_type} NULL")
+
+    cursor.execute(f"CREATE TYPE [dbo].[{type_name}] AS TABLE ({', '.join(definitions)})")
+    return type_name
 
 @error_handling_wrapper
-def insert_data_into_table(connection, table_name, df, batch_size=1000, progress_callback=None):
-    from validation import clean_data_for_sql
+def insert_data_into_table(connection, table_name, df, batch_size=1000, progress_callback=None,
+                           fast_executemany=True, load_strategy='executemany', stage_dir=None,
+                           cancel_event=None):
+    """Insert df in batches using the selected load strategy
+
+    - executemany: each batch is one executemany call; with fast_executemany
+      the ODBC driver binds the batch as a parameter array (one round trip).
+    - bulk_insert: each batch is staged to a CSV file in stage_dir, loaded
+      with BULK INSERT (SQL Server 2017+) into a temp table and copied into
+      the target with INSERT ... SELECT.
+    - tvp: each batch is streamed as a table-valued parameter of a staging
+      table type generated from the target table, then INSERT ... SELECT.
+
+    Setting cancel_event (a threading.Event) stops the load after the
+    batch in flight; batches already committed are kept.
+    """
+    from validation import clean_data_for_sql, to_sql_rows
+    
+    if load_strategy not in LOAD_STRATEGIES:
+        raise ValueError(f"Unknown load strategy: {load_strategy}")
     
     cursor = connection.cursor()
+    cursor.fast_executemany = fast_executemany
     df = clean_data_for_sql(df)  # Clean data before insertion
     
     columns = ", ".join([f"[{col}]" for col in df.columns])
@@ -84,14 +829,31 @@ def insert_data_into_table(connection, table_name, df, batch_size=1000, progress
     connection.autocommit = False
     total_records = len(df)
     start_time = time.time()
+    type_name = None
+    stage_name = None
+    batch = None
+    logging.info(f"Loading '{table_name}' with strategy: {load_strategy}")
     
     try:
+        if load_strategy == 'tvp':
+            type_name = _create_staging_type(cursor, table_name, df.columns)
+            insert_query = f"INSERT INTO [{table_name}] ({columns}) SELECT {columns} FROM ?"
+        elif load_strategy == 'bulk_insert':
+            stage_name = _create_bulk_stage(cursor, table_name, df.columns)
+        
         for start in range(0, total_records, batch_size):
+            if cancel_event is not None and cancel_event.is_set():
+                logging.warning(f"Load of '{table_name}' cancelled after {start} of {total_records} records")
+                return
             batch = df.iloc[start:start + batch_size]
-            for index, row in batch.iterrows():
-                # Convert row to list and handle None values
-                values = [None if pd.isna(v) else v for v in row]
-                cursor.execute(insert_query, values)
+            rows = to_sql_rows(batch)
+            if load_strategy == 'bulk_insert':
+                _bulk_insert_batch(cursor, table_name, stage_name, df.columns, rows, stage_dir)
+            elif load_strategy == 'tvp':
+                # pyodbc takes the table type name and schema ahead of the rows
+                cursor.execute(insert_query, [[type_name, 'dbo'] + rows])
+            else:
+                cursor.executemany(insert_query, rows)
             
             connection.commit()
             progress = (start + len(batch)) / total_records * 100
@@ -111,8 +873,22 @@ def insert_data_into_table(connection, table_name, df, batch_size=1000, progress
         connection.rollback()
         logging.error(f"Error inserting data: {e}")
         # Save the state for recovery
-        save_failed_batch(batch)
+        if batch is not None:
+            save_failed_batch(batch)
     finally:
+        # A rollback may already have undone the CREATE, so only drop what exists
+        if type_name:
+            try:
+                cursor.execute(f"IF TYPE_ID('dbo.{type_name}') IS NOT NULL DROP TYPE [dbo].[{type_name}]")
+                connection.commit()
+            except pyodbc.Error as e:
+                logging.warning(f"Could not drop staging type {type_name}: {e}")
+        if stage_name:
+            try:
+                cursor.execute(f"IF OBJECT_ID('tempdb..{stage_name}') IS NOT NULL DROP TABLE [{stage_name}]")
+                connection.commit()
+            except pyodbc.Error as e:
+                logging.warning(f"Could not drop staging table {stage_name}: {e}")
         connection.autocommit = True
 
 def save_failed_batch(batch):
@@ -126,13 +902,16 @@ def recover_failed_batches(connection, table_name, config):
         if not failed_batch.empty:
             logging.info("Recovering failed batch...")
             insert_data_into_table(connection, table_name, failed_batch, 
-                                 batch_size=config['batch_size'])
+                                 batch_size=config['batch_size'],
+                                 fast_executemany=config.get('fast_executemany', True),
+                                 load_strategy=config.get('load_strategy', 'executemany'),
+                                 stage_dir=config.get('bulk_stage_dir') or None)
             logging.info("Failed batch recovery completed.")
     except FileNotFoundError:
         logging.info("No failed batch found for recovery.")
 
-def generate_sql_script(table_name, schema, table_info, data_df):
-    """Generate SQL script for table creation"""
+def generate_sql_script(table_name, spec):
+    """Generate SQL script for table creation from the sheet's TableSpec"""
     sql_script = []
     
     # Drop table if exists
@@ -141,21 +920,21 @@ def generate_sql_script(table_name, schema, table_info, data_df):
     sql_script.append("")
     
     # Create table
-    columns = [f"[{col}] {dtype}" for col, dtype in schema.items()]
+    columns = ',\n    '.join(f"[{col}] {dtype}" for col, dtype in spec.definitions().items())
     # Remove primary key constraint creation
     
     create_table = f"""CREATE TABLE [{table_name}] (
-    {',\n    '.join(columns)}
+    {columns}
 );"""
     sql_script.append(create_table)
     sql_script.append("GO")
     sql_script.append("")
     
     # Add table description
-    if table_info and table_info.get('description'):
+    if spec.description:
         desc_query = f"""EXEC sp_addextendedproperty 
 @name = N'MS_Description',
-@value = N'{table_info['description']}',
+@value = N'{spec.description}',
 @level0type = N'SCHEMA', @level0name = 'dbo',
 @level1type = N'TABLE', @level1name = N'{table_name}';"""
         sql_script.append(desc_query)
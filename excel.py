@@ -1,8 +1,51 @@
 import os
+import re
+import hashlib
+import posixpath
+import zipfile
 import pandas as pd
 import logging
+import multiprocessing
+from logging.handlers import QueueHandler, QueueListener
+from xml.etree import ElementTree
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from validation import error_handling_wrapper
 
+# กำหนดคอลัมน์ที่คาดหวังตามลำดับ
+EXPECTED_COLUMNS = [
+    'Back', 'Key', 'No', 'Name', 'Nul', 'Type', 'Len', 'Dec', 'Und', 'Def', 'Desc', 'Note', 'TableCode', 'TableName', 'TableDesc', 'TableNote'
+]
+
+# ชนิดข้อมูลที่กำหนดตอนอ่านชีต แทนการให้ pandas อนุมานเอง คอลัมน์อื่นยังใช้การอนุมานตามปกติ
+# Def ยังใช้การอนุมาน: ถ้าอ่านเป็น str ค่าเริ่มต้นที่เป็นตัวเลข (เช่น 0) จะกลายเป็น DEFAULT '0'
+# ซึ่งเปลี่ยน DDL ที่สร้างจากเดิม
+SHEET_DTYPES = {
+    'Key': str, 'Name': str, 'Type': str, 'Nul': str, 'Desc': str,
+    'No': 'Int64', 'Len': 'Int64', 'Dec': 'Int64',
+}
+
+# คอลัมน์ที่มีค่าซ้ำกันมาก (ชื่อตารางซ้ำทุกแถว, Type/Key/Nul มีค่าไม่กี่แบบ) เก็บเป็น category
+# เพื่อให้แต่ละค่าเก็บเพียงครั้งเดียวและแต่ละแถวเก็บแค่ code
+CATEGORY_COLUMNS = ['Key', 'Nul', 'Type', 'TableCode', 'TableName', 'TableDesc', 'TableNote']
+
+def apply_sheet_dtypes(df):
+    """แปลง DataFrame เป็น SHEET_DTYPES โดยคงช่องว่างไว้เป็น NaN แบบเดียวกับ read_excel(dtype=...)
+
+    df.astype(str) บน pandas < 3 จะแปลง None เป็นข้อความ 'None' จึงแปลงเฉพาะค่าที่ไม่ว่าง
+    """
+    df = df.copy()
+    for col, dtype in SHEET_DTYPES.items():
+        if dtype is str:
+            df[col] = df[col].astype(str).where(df[col].notna())
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def compact_sheet_frame(df):
+    """แปลง CATEGORY_COLUMNS ของชีตที่โหลดแล้วเป็น category dtype"""
+    return df.astype({col: 'category' for col in CATEGORY_COLUMNS if col in df.columns})
+
 def validate_column_order(df, expected_columns):
     """ตรวจสอบชื่อและลำดับของคอลัมน์ให้ตรงกับโครงสร้างที่คาดหวัง"""
     actual_columns = df.columns.tolist()
@@ -20,109 +63,511 @@ def validate_column_order(df, expected_columns):
     
     return validation_errors
 
-@error_handling_wrapper
-def validate_sheet(file_path, sheet_name):
-    """Validate if a sheet has the required schema format"""
+# คอลัมน์ที่ชีตต้องมีจึงจะถือว่าเป็นชีต data dictionary
+REQUIRED_COLUMNS = ['Key', 'Name', 'Type', 'Len']
+
+def check_sheet_header(xls, sheet_name):
+    """ตรวจสอบว่าชีตมี REQUIRED_COLUMNS และมีค่าในคอลัมน์ Name อย่างน้อยหนึ่งแถว
+    โดยอ่านเพียงแถวหัวตารางและแถวจนถึง Name แรกที่มีค่า
+
+    ชีตที่ไม่ถูกต้อง (เช่น หน้าปก หรือ change log) จะถูกปฏิเสธโดยไม่ต้องอ่านทั้งชีต
+    คืนค่า list ของหัวตาราง (ตัดช่องว่างท้ายแถวออก) หรือ None ถ้าชีตไม่ถูกต้อง
+    """
+    header, rows, _ = open_sheet_rows(xls, sheet_name)
+    # pd.read_excel ข้ามแถวว่างด้านบนก่อนใช้แถวแรกที่มีค่าเป็นหัวตาราง
+    while header is not None and not any(v is not None for v in header):
+        header = next(rows, None)
+    header = list(header or ())
+    
+    while header and header[-1] is None:
+        header.pop()
+    
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing_columns:
+        logging.warning(f"Sheet '{sheet_name}' missing required columns: {missing_columns}")
+        return None
+    
+    name_index = header.index('Name')
+    for row in rows:
+        if name_index < len(row) and row[name_index] is not None:
+            return header
+    logging.warning(f"Sheet '{sheet_name}' has no valid data in Name column")
+    return None
+
+def open_workbook(file_path):
+    """เปิดไฟล์ Excel ครั้งเดียวเพื่อใช้ร่วมกันระหว่างการอ่านหลายชีต
+
+    ถ้าได้รับ pd.ExcelFile ที่เปิดไว้แล้วจะคืนค่าเดิมกลับไป
+    """
+    if isinstance(file_path, pd.ExcelFile):
+        return file_path
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"ไม่พบไฟล์: {file_path}")
+    return pd.ExcelFile(file_path)
+
+def _normalize_cell(value):
+    """แปลงค่าจาก openpyxl ให้ตรงกับที่ pd.read_excel ให้ผล"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if value == '':
+        return None
+    return value
+
+def iter_sheet_records(worksheet):
+    """Stream compact column records from a read-only openpyxl worksheet
+
+    Only the first 16 expected columns are read and rows without a ``Name``
+    are skipped, so trailing blank rows and junk columns never reach memory.
+    """
+    width = len(EXPECTED_COLUMNS)
+    name_index = EXPECTED_COLUMNS.index('Name')
+    for row in worksheet.iter_rows(min_row=2, max_col=width, values_only=True):
+        if len(row) <= name_index or row[name_index] in (None, ''):
+            continue
+        record = tuple(_normalize_cell(value) for value in row)
+        if len(record) < width:
+            record += (None,) * (width - len(record))
+        yield record
+
+def load_sheet_streaming(book, sheet_name):
+    """อ่านชีตเดียวแบบ streaming จาก openpyxl workbook ที่เปิดด้วย read_only=True
+
+    ให้ผลเหมือน load_sheet แต่สร้าง DataFrame จากแถวที่มี Name เท่านั้น
+    คืนค่า None ถ้าชีตไม่ถูกต้อง
+    """
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        worksheet = book[sheet_name]
+        header = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
         
         # Check required columns
-        required_columns = ['Key', 'Name', 'Type', 'Len']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
         if missing_columns:
             logging.warning(f"Sheet '{sheet_name}' missing required columns: {missing_columns}")
-            return False
-            
-        # Check if sheet has valid data
-        if df['Name'].dropna().empty:
+            logging.warning(f"Skipping invalid sheet: {sheet_name}")
+            return None
+        
+        # ตรวจสอบว่าจำนวนคอลัมน์ตรงกับจำนวนที่คาดหวังหรือไม่
+        if len(header) != len(EXPECTED_COLUMNS):
+            logging.warning(f"ชีต {sheet_name} มีจำนวนคอลัมน์ที่ไม่คาดหวัง: {len(header)}")
+            return None
+        
+        records = list(iter_sheet_records(worksheet))
+        if not records:
             logging.warning(f"Sheet '{sheet_name}' has no valid data in Name column")
-            return False
-            
-        return True
+            logging.warning(f"Skipping invalid sheet: {sheet_name}")
+            return None
+        
+        df = pd.DataFrame.from_records(records, columns=EXPECTED_COLUMNS)
+        try:
+            df = apply_sheet_dtypes(df)
+        except (ValueError, TypeError) as e:
+            logging.warning(f"ชีต {sheet_name} มีค่าที่ไม่ตรงกับชนิดข้อมูลที่กำหนด จะใช้ชนิดข้อมูลที่อนุมานได้แทน: {e}")
+        # คอลัมน์อื่นที่ว่างทั้งหมดให้เป็น NaN แบบเดียวกับ pd.read_excel
+        for col in df.columns[df.isna().all()]:
+            if col not in SHEET_DTYPES:
+                df[col] = df[col].astype('float64')
+        df = compact_sheet_frame(df)
+        
+        logging.info(f"ชีต {sheet_name} โหลดสำเร็จด้วย {len(df)} คอลัมน์ที่ถูกต้อง")
+        return df
         
     except Exception as e:
-        logging.error(f"Error validating sheet '{sheet_name}': {e}")
-        return False
+        logging.error(f"เกิดข้อผิดพลาดในการอ่านชีต {sheet_name}: {e}")
+        return None
 
-@error_handling_wrapper
-def read_excel_file(file_path):
+def parse_expected_columns(xls, sheet_name):
+    """อ่านเฉพาะคอลัมน์ตามตำแหน่งของ EXPECTED_COLUMNS โดยใช้ SHEET_DTYPES
+
+    ถ้าค่าในชีตแปลงเป็นชนิดที่กำหนดไม่ได้ (เช่น Len เป็นข้อความหรือทศนิยม)
+    จะอ่านใหม่โดยให้ pandas อนุมานชนิดข้อมูลแบบเดิม
+    """
+    options = dict(header=0, names=EXPECTED_COLUMNS, usecols=list(range(len(EXPECTED_COLUMNS))))
     try:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"ไม่พบไฟล์: {file_path}")
-            
-        # อ่านไฟล์ Excel
-        xls = pd.ExcelFile(file_path)
-        if not xls.sheet_names:
-            raise ValueError("ไฟล์ Excel ไม่มีชีต")
-            
-        # กำหนดคอลัมน์ที่คาดหวังตามลำดับ
-        expected_columns = [
-            'Back', 'Key', 'No', 'Name', 'Nul', 'Type', 'Len', 'Dec', 'Und', 'Def', 'Desc', 'Note', 'TableCode', 'TableName', 'TableDesc', 'TableNote'
-        ]
+        return xls.parse(sheet_name, dtype=SHEET_DTYPES, **options)
+    except (ValueError, TypeError) as e:
+        logging.warning(f"ชีต {sheet_name} มีค่าที่ไม่ตรงกับชนิดข้อมูลที่กำหนด จะอ่านโดยอนุมานชนิดข้อมูลแทน: {e}")
+        return xls.parse(sheet_name, **options)
+
+def load_sheet(xls, sheet_name):
+    """อ่านและตรวจสอบชีตเดียวจาก workbook ที่เปิดไว้แล้ว โดยแยกวิเคราะห์ชีตเพียงครั้งเดียว
+
+    คืนค่า DataFrame ที่ผ่านการตรวจสอบ หรือ None ถ้าชีตไม่ถูกต้อง
+    """
+    try:
+        # ปฏิเสธชีตที่ไม่ถูกต้องจากหัวตารางก่อน โดยไม่ต้องแยกวิเคราะห์ทั้งชีต
+        header = check_sheet_header(xls, sheet_name)
+        if header is None:
+            logging.warning(f"Skipping invalid sheet: {sheet_name}")
+            return None
         
-        df_dict = {}
+        # ตรวจสอบว่าจำนวนคอลัมน์ตรงกับจำนวนที่คาดหวังหรือไม่
+        if len(header) != len(EXPECTED_COLUMNS):
+            logging.warning(f"ชีต {sheet_name} มีจำนวนคอลัมน์ที่ไม่คาดหวัง: {len(header)}")
+            return None
         
-        # Modify to handle selected sheets from config
-        if 'selected_sheets' in globals().get('config', {}):
-            sheet_names = [s for s in config['selected_sheets'] if s in xls.sheet_names]
-        else:
-            sheet_names = xls.sheet_names
+        # อ่านเฉพาะ 16 คอลัมน์ที่คาดหวังด้วยชื่อและชนิดข้อมูลที่กำหนดไว้
+        df = parse_expected_columns(xls, sheet_name)
         
-        for sheet_name in sheet_names:
-            # Only process if sheet validates
-            if not validate_sheet(file_path, sheet_name):
-                logging.warning(f"Skipping invalid sheet: {sheet_name}")
-                continue
-            
-            try:
-                # อ่านชีต Excel
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
-                
-                # ตรวจสอบว่าจำนวนคอลัมน์ตรงกับจำนวนที่คาดหวังหรือไม่
-                if len(df.columns) != len(expected_columns):
-                    logging.warning(f"ชีต {sheet_name} มีจำนวนคอลัมน์ที่ไม่คาดหวัง: {len(df.columns)}")
-                    continue
-                
-                # เปลี่ยนชื่อคอลัมน์ให้ตรงกับชื่อที่คาดหวัง
-                df.columns = expected_columns
-                
-                # ตรวจสอบโครงสร้างของคอลัมน์
-                validation_errors = validate_column_order(df, expected_columns)
-                if validation_errors:
-                    logging.warning(f"ชีต {sheet_name} มีข้อผิดพลาดในการตรวจสอบ:")
-                    for error in validation_errors:
-                        logging.warning(f"  {error}")
+        # ตรวจสอบโครงสร้างของคอลัมน์
+        validation_errors = validate_column_order(df, EXPECTED_COLUMNS)
+        if validation_errors:
+            logging.warning(f"ชีต {sheet_name} มีข้อผิดพลาดในการตรวจสอบ:")
+            for error in validation_errors:
+                logging.warning(f"  {error}")
+            return None
+        
+        # ลบแถวที่ 'Name' ว่างเปล่า
+        df = df.dropna(subset=['Name'])
+        
+        if df.empty:
+            logging.warning(f"ชีต {sheet_name} ไม่มีข้อมูลที่ถูกต้องหลังจากการกรอง")
+            return None
+        
+        # จัดเรียงตามดัชนีและรีเซ็ต
+        df = df.reset_index(drop=True)
+        
+        # ตรวจสอบให้แน่ใจว่ามีคอลัมน์ที่คาดหวังทั้งหมด
+        for col in EXPECTED_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        df = compact_sheet_frame(df)
+        
+        logging.info(f"ชีต {sheet_name} โหลดสำเร็จด้วย {len(df)} คอลัมน์ที่ถูกต้อง")
+        logging.info(f"ตรวจสอบลำดับคอลัมน์: {', '.join(df.columns)}")
+        return df
+        
+    except Exception as e:
+        logging.error(f"เกิดข้อผิดพลาดในการอ่านชีต {sheet_name}: {e}")
+        return None
+
+def open_sheet_rows(xls, sheet_name, chunk_size=500):
+    """เปิดชีตเพื่ออ่านแถวทีละส่วนโดยไม่ต้องอ่านทั้งชีต
+
+    คืนค่า (header, rows, total) โดย rows เป็น iterator ของ tuple ของแต่ละแถวข้อมูล
+    และ total คือจำนวนแถวข้อมูลโดยประมาณจาก <dimension> ของชีต (None ถ้าไม่ทราบ)
+    สำหรับ .xlsx จะใช้ worksheet แบบ read-only ของ openpyxl ส่วน engine อื่นจะอ่านทีละ chunk_size แถว
+    """
+    if xls.engine == 'openpyxl':
+        worksheet = xls.book[sheet_name]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, ())
+        total = worksheet.max_row - 1 if worksheet.max_row else None
+        return header, (tuple(_normalize_cell(v) for v in row) for row in rows), total
+
+    header = tuple(xls.parse(sheet_name, nrows=0).columns)
+
+    def chunks():
+        start = 0
+        while True:
+            chunk = xls.parse(sheet_name, header=None, skiprows=start + 1, nrows=chunk_size)
+            yield from (tuple(None if pd.isna(v) else v for v in row)
+                        for row in chunk.itertuples(index=False))
+            if len(chunk) < chunk_size:
+                return
+            start += chunk_size
+
+    return header, chunks(), None
+
+# workbook ที่แต่ละ worker process เปิดไว้เอง (ใช้ใน _load_sheet_in_worker)
+_worker_workbook = None
+
+def _init_sheet_worker(file_path, log_queue=None, log_level=logging.INFO):
+    """เปิด workbook หนึ่งครั้งต่อ worker process และส่ง log ของ worker ไปยัง log_queue"""
+    global _worker_workbook
+    if log_queue is not None:
+        # worker แบบ fork ได้ QueueHandler ของ process หลักที่ชี้ไปยังสำเนาของคิวที่ไม่มีใครอ่าน
+        # ส่วนแบบ spawn ไม่มี handler เลย จึงแทนที่ด้วยคิวที่ process หลักอ่านอยู่
+        root = logging.getLogger()
+        root.handlers[:] = [QueueHandler(log_queue)]
+        root.setLevel(log_level)
+    _worker_workbook = pd.ExcelFile(file_path)
+
+def _load_sheet_in_worker(sheet_name, streaming):
+    if streaming and _worker_workbook.engine == 'openpyxl':
+        return load_sheet_streaming(_worker_workbook.book, sheet_name)
+    return load_sheet(_worker_workbook, sheet_name)
+
+class _ForwardHandler(logging.Handler):
+    """ส่ง record ที่ได้รับจาก worker process ต่อให้ logger เดียวกันใน process หลัก"""
+    def emit(self, record):
+        logger = logging.getLogger(record.name) if record.name != 'root' else logging.getLogger()
+        logger.handle(record)
+
+def load_sheets_parallel(file_path, sheet_names, streaming=False, workers=2):
+    """อ่านและตรวจสอบหลายชีตพร้อมกันด้วย ProcessPoolExecutor
+
+    แต่ละ worker เปิด workbook เอง ผลลัพธ์เรียงตามลำดับของ sheet_names เสมอ
+    log ของ worker ถูกส่งกลับมาทาง multiprocessing.Queue และเขียนผ่าน handler ของ process หลัก
+    """
+    workers = min(workers, len(sheet_names))
+    logging.info(f"กำลังอ่าน {len(sheet_names)} ชีตด้วย {workers} worker process")
+    log_queue = multiprocessing.Queue()
+    listener = QueueListener(log_queue, _ForwardHandler())
+    listener.start()
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_sheet_worker,
+                                 initargs=(file_path, log_queue, logging.getLogger().getEffectiveLevel())) as executor:
+            frames = executor.map(_load_sheet_in_worker, sheet_names, repeat(streaming))
+            return list(zip(sheet_names, frames))
+    finally:
+        # worker ทั้งหมดจบแล้ว record ที่ส่งมาจึงอยู่ในคิวก่อน sentinel ของ stop()
+        listener.stop()
+        log_queue.close()
+
+# เพิ่มค่านี้เมื่อผลลัพธ์ของ load_sheet เปลี่ยน เพื่อไม่ให้ใช้แคชเก่า
+LOADER_VERSION = 5
+
+_RELS_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PKG_RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_SHARED_STRING_REF = re.compile(rb'<(?:\w+:)?c\b[^>]*\bt="s"[^>]*>\s*<(?:\w+:)?v>(\d+)</(?:\w+:)?v>')
+
+def get_sheet_parts(archive):
+    """คืนค่า dict ชื่อชีต -> path ของ XML ภายในไฟล์ xlsx ตามลำดับใน workbook.xml"""
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    for rel in rels.iter(f'{{{_PKG_RELS_NS}}}Relationship'):
+        target = rel.get('Target', '')
+        # Target อาจเป็น path แบบสัมพัทธ์กับ xl/ หรือแบบเต็มที่ขึ้นต้นด้วย /
+        targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else posixpath.normpath(f'xl/{target}')
+    parts = {}
+    for sheet in workbook.iter():
+        if sheet.tag.endswith('}sheet'):
+            parts[sheet.get('name')] = targets.get(sheet.get(f'{{{_RELS_NS}}}id'))
+    return parts
+
+def _read_shared_strings(archive):
+    try:
+        data = archive.read('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    for si in ElementTree.fromstring(data):
+        strings.append(''.join(node.text or '' for node in si.iter() if node.tag.endswith('}t')))
+    return strings
+
+def sheet_cache_keys(file_path, streaming=False, sheet_names=None):
+    """สร้าง key สำหรับแคชของแต่ละชีตจาก hash ของ XML ของชีตนั้นในไฟล์ xlsx
+
+    key รวมข้อความใน sharedStrings ที่ชีตอ้างถึงด้วย เพื่อให้การแก้ไขชีตอื่นไม่ทำให้แคชของชีตนี้หมดอายุ
+    การเปลี่ยนเฉพาะรูปแบบตัวเลข (styles.xml) จะไม่ถูกตรวจพบ
+    ถ้าระบุ sheet_names จะ hash เฉพาะชีตเหล่านั้น ชีตที่ไม่มีในไฟล์จะไม่อยู่ในผลลัพธ์
+    คืนค่า dict ว่างถ้าไฟล์ไม่ใช่ xlsx
+    """
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            parts = get_sheet_parts(archive)
+            if sheet_names:
+                wanted = set(sheet_names)
+                parts = {name: part for name, part in parts.items() if name in wanted}
+            shared_strings = None
+            keys = {}
+            for sheet_name, part in parts.items():
+                if part is None:
                     continue
-                
-                # ลบแถวที่ 'Name' ว่างเปล่า
-                df = df.dropna(subset=['Name'])
-                
+                xml = archive.read(part)
+                digest = hashlib.sha256(f"{LOADER_VERSION}:{int(streaming)}:".encode())
+                digest.update(xml)
+                refs = _SHARED_STRING_REF.findall(xml)
+                if refs:
+                    if shared_strings is None:
+                        shared_strings = _read_shared_strings(archive)
+                    for ref in refs:
+                        index = int(ref)
+                        text = shared_strings[index] if index < len(shared_strings) else ''
+                        digest.update(b'\x00' + text.encode('utf-8'))
+                keys[sheet_name] = digest.hexdigest()
+            return keys
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        logging.info(f"ไม่สามารถสร้าง key แคชสำหรับ {file_path}: {e}")
+        return {}
+
+def iter_excel_sheets(file_path, sheet_names=None, streaming=False, cache=None, workers=1):
+    """อ่านชีตทีละชีตแบบ generator และ yield (sheet_name, df) เฉพาะชีตที่ถูกต้อง ตามลำดับของ sheet_names
+
+    file_path อาจเป็น path ของไฟล์หรือ pd.ExcelFile ที่เปิดไว้แล้ว
+    ชีตถัดไปจะถูกอ่านเมื่อผู้เรียกขอเท่านั้น workbook จะถูกปิดเมื่อ generator จบหรือถูกปิด
+    ถ้า streaming=True จะอ่านแถวผ่าน worksheet แบบ read-only ของ openpyxl โดยตรง (รองรับเฉพาะ .xlsx)
+    ถ้าระบุ cache (SheetCache) และ file_path เป็น path ชีตที่ XML ไม่เปลี่ยนจะโหลดจากแคชโดยไม่ต้องแยกวิเคราะห์
+    ถ้า workers > 1 และ file_path เป็น path ชีตที่ไม่อยู่ในแคชจะถูกแยกวิเคราะห์ล่วงหน้าใน process pool
+    """
+    owns_workbook = not isinstance(file_path, pd.ExcelFile)
+    xls = None
+    try:
+        if owns_workbook and not os.path.exists(file_path):
+            raise FileNotFoundError(f"ไม่พบไฟล์: {file_path}")
+
+        cache_keys = {}
+        if cache is not None and owns_workbook:
+            cache_keys = sheet_cache_keys(file_path, streaming, sheet_names)
+
+        # ถ้ามี key แคชแล้วจะรู้ชื่อชีต (ที่เลือกและมีอยู่จริง) โดยไม่ต้องเปิดด้วย pandas
+        if cache_keys:
+            available_sheets = list(cache_keys)
+        else:
+            xls = open_workbook(file_path)
+            available_sheets = xls.sheet_names
+        if not available_sheets:
+            raise ValueError("ไฟล์ Excel ไม่มีชีต")
+
+        if sheet_names:
+            sheet_names = [s for s in sheet_names if s in available_sheets]
+        else:
+            sheet_names = available_sheets
+
+        # workers > 1: ค้นแคชก่อน แล้วแยกวิเคราะห์ชีตที่เหลือพร้อมกันใน process pool
+        prefetch = bool(workers and workers > 1 and owns_workbook)
+        cached = {}
+        parsed = {}
+        if prefetch:
+            for sheet_name in sheet_names:
+                df = cache.get(cache_keys[sheet_name]) if cache_keys else None
+                if df is not None:
+                    cached[sheet_name] = df
+            pending = [s for s in sheet_names if s not in cached]
+            if len(pending) > 1:
+                parsed = dict(load_sheets_parallel(file_path, pending, streaming, workers))
+
+        parsed_any = False
+        for sheet_name in sheet_names:
+            if prefetch:
+                df = cached.pop(sheet_name, None)
+            else:
+                df = cache.get(cache_keys[sheet_name]) if cache_keys else None
+            if df is not None:
                 if df.empty:
-                    logging.warning(f"ชีต {sheet_name} ไม่มีข้อมูลที่ถูกต้องหลังจากการกรอง")
+                    # ชีตที่ไม่ถูกต้องถูกเก็บในแคชเป็น DataFrame ว่าง
+                    logging.warning(f"Skipping invalid sheet: {sheet_name} (cached)")
                     continue
-                
-                # จัดเรียงตามดัชนีและรีเซ็ต
-                df = df.reset_index(drop=True)
-                
-                # ตรวจสอบให้แน่ใจว่ามีคอลัมน์ที่คาดหวังทั้งหมด
-                for col in expected_columns:
-                    if col not in df.columns:
-                        df[col] = None
-                
-                df_dict[sheet_name] = df
-                logging.info(f"ชีต {sheet_name} โหลดสำเร็จด้วย {len(df)} คอลัมน์ที่ถูกต้อง")
-                logging.info(f"ตรวจสอบลำดับคอลัมน์: {', '.join(df.columns)}")
-                
-            except Exception as e:
-                logging.error(f"เกิดข้อผิดพลาดในการอ่านชีต {sheet_name}: {e}")
+                logging.info(f"ชีต {sheet_name} โหลดจากแคช ({len(df)} คอลัมน์)")
+                yield sheet_name, df
                 continue
-        
+
+            if sheet_name in parsed:
+                df = parsed.pop(sheet_name)
+            else:
+                if xls is None:
+                    xls = open_workbook(file_path)
+                if streaming and xls.engine != 'openpyxl':
+                    logging.warning(f"โหมด streaming ไม่รองรับ engine {xls.engine} จะใช้การอ่านแบบปกติแทน")
+                    streaming = False
+                if streaming:
+                    # pandas เปิด openpyxl workbook ด้วย read_only=True อยู่แล้ว จึงใช้ร่วมกันได้
+                    df = load_sheet_streaming(xls.book, sheet_name)
+                else:
+                    df = load_sheet(xls, sheet_name)
+            if cache_keys:
+                cache.put(cache_keys[sheet_name], df if df is not None else pd.DataFrame())
+                parsed_any = True
+            if df is not None:
+                yield sheet_name, df
+        if parsed_any:
+            cache.evict()
+    finally:
+        if owns_workbook and xls is not None:
+            xls.close()
+
+_CELL_REF = re.compile(r'([A-Z]+)(\d+)')
+
+def _column_index(letters):
+    """'A' -> 1, 'P' -> 16, 'AA' -> 27"""
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index
+
+def _cell_text(cell, shared_strings):
+    cell_type = cell.get('t')
+    if cell_type == 'inlineStr':
+        return ''.join(node.text or '' for node in cell.iter() if node.tag.endswith('}t'))
+    value = next((node.text for node in cell if node.tag.endswith('}v')), None)
+    if value is None:
+        return None
+    if cell_type == 's':
+        index = int(value)
+        return shared_strings[index] if index < len(shared_strings) else None
+    return value
+
+def _scan_sheet_part(archive, part, shared_strings):
+    """อ่านเฉพาะ <dimension> และแถวแรกของชีต แล้วหยุดทันที"""
+    rows = columns = None
+    header = ()
+    with archive.open(part) as stream:
+        for _, element in ElementTree.iterparse(stream):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == 'dimension':
+                refs = _CELL_REF.findall(element.get('ref', ''))
+                if refs:
+                    rows = int(refs[-1][1])
+                    columns = _column_index(refs[-1][0])
+            elif tag == 'row':
+                if element.get('r', '1') == '1':
+                    values = {}
+                    for cell in element:
+                        match = _CELL_REF.match(cell.get('r', ''))
+                        if match:
+                            values[_column_index(match.group(1))] = _cell_text(cell, shared_strings)
+                    width = max(values, default=0)
+                    header = tuple(values.get(i) for i in range(1, width + 1))
+                break
+            elif tag == 'sheetData':
+                break
+    return {'rows': rows, 'columns': columns, 'header': header}
+
+# (path, mtime, size) -> index; ไฟล์ที่ถูกแก้ไขจะได้ key ใหม่
+_workbook_index_cache = {}
+
+def read_workbook_index(file_path):
+    """คืนค่า dict ชื่อชีต -> {'rows', 'columns', 'header'} ตามลำดับใน workbook
+
+    สำหรับ .xlsx จะอ่านเพียง xl/workbook.xml และส่วนต้นของ XML แต่ละชีต (<dimension> และแถวหัวตาราง)
+    โดยไม่แยกวิเคราะห์ข้อมูลในชีต rows คือแถวสุดท้ายตาม <dimension> (รวมแถวหัวตาราง)
+    หรือ None ถ้าชีตไม่มี <dimension>
+    ผลลัพธ์ถูกแคชตาม mtime และขนาดไฟล์ ไฟล์ประเภทอื่นจะได้เฉพาะชื่อชีต (ค่าอื่นเป็น None)
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    index = _workbook_index_cache.get(key)
+    if index is not None:
+        return index
+
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            shared_strings = _read_shared_strings(archive)
+            names = set(archive.namelist())
+            index = {}
+            for sheet_name, part in get_sheet_parts(archive).items():
+                if part not in names:
+                    index[sheet_name] = {'rows': None, 'columns': None, 'header': ()}
+                else:
+                    index[sheet_name] = _scan_sheet_part(archive, part, shared_strings)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        logging.info(f"ไม่สามารถสร้างดัชนีของ {file_path} จาก XML ได้ จะใช้ pandas แทน: {e}")
+        with pd.ExcelFile(file_path) as xls:
+            index = {name: {'rows': None, 'columns': None, 'header': ()} for name in xls.sheet_names}
+
+    # ล้างรายการของไฟล์เดียวกันที่หมดอายุแล้ว
+    for stale in [k for k in _workbook_index_cache if k[0] == key[0]]:
+        del _workbook_index_cache[stale]
+    _workbook_index_cache[key] = index
+    return index
+
+@error_handling_wrapper
+def read_excel_file(file_path, sheet_names=None, streaming=False, workers=1, cache=None):
+    """อ่านชีตทั้งหมด (หรือเฉพาะ sheet_names) จากไฟล์ Excel เป็น dict ชื่อชีต -> DataFrame
+
+    รวมผลของ iter_excel_sheets (ดูความหมายของพารามิเตอร์ที่นั่น) ไฟล์จะถูกเปิดเพียงครั้งเดียว
+    และแต่ละชีตจะถูกแยกวิเคราะห์เพียงครั้งเดียว
+    """
+    try:
+        df_dict = dict(iter_excel_sheets(file_path, sheet_names, streaming, cache, workers))
         if not df_dict:
             raise ValueError("ไม่พบชีตที่ถูกต้องในไฟล์ Excel")
-            
         return df_dict
-        
     except Exception as e:
         logging.error(f"เกิดข้อผิดพลาดในการอ่านไฟล์ Excel: {e}")
         raise
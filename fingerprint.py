@@ -0,0 +1,76 @@
+import os
+import json
+import hashlib
+import logging
+import sqlite3
+import time
+
+class FingerprintStore:
+    """SQLite record of the schema last deployed for each table
+
+    Rows are keyed by target (server/database) and table name. A table
+    whose column definitions and table_info hash to the stored fingerprint
+    has not changed since its last successful deploy and can be skipped
+    without touching the database.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS fingerprints (
+                target TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                deployed_at REAL NOT NULL,
+                PRIMARY KEY (target, table_name)
+            )"""
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def target_key(db_config):
+        return f"{db_config.get('server', '')}/{db_config.get('database', '')}".lower()
+
+    @staticmethod
+    def fingerprint(spec):
+        """Stable hash of a TableSpec's column definitions and table_info"""
+        payload = json.dumps(
+            {'schema': spec.definitions(), 'table_info': spec.table_info()},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, target, table_name):
+        row = self.connection.execute(
+            "SELECT fingerprint FROM fingerprints WHERE target = ? AND table_name = ?",
+            (target, table_name)
+        ).fetchone()
+        return row[0] if row else None
+
+    def record(self, target, entries):
+        """Store (table_name, fingerprint) pairs after a successful deploy"""
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO fingerprints (target, table_name, fingerprint, deployed_at) "
+            "VALUES (?, ?, ?, ?)",
+            [(target, table_name, fp, now) for table_name, fp in entries]
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+def open_fingerprint_store(config):
+    """Return a FingerprintStore for config, or None when it is disabled"""
+    if not config.get('fingerprints_enabled', True):
+        return None
+    db_path = config.get('fingerprint_db')
+    if not db_path:
+        from config_manager import ConfigManager
+        db_path = os.path.join(ConfigManager().config_dir, 'fingerprints.sqlite')
+    try:
+        return FingerprintStore(db_path)
+    except sqlite3.Error as e:
+        logging.warning(f"Could not open fingerprint store {db_path}: {e}")
+        return None
@@ -1,13 +1,17 @@
 import os
+import copy
 import json
 import logging
+import queue
+import threading
+from itertools import islice
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from ttkthemes import ThemedStyle  # Add this import
 from database import connect_to_database
+from excel import REQUIRED_COLUMNS, open_sheet_rows, open_workbook, read_workbook_index
 from validation import generate_schema  # Add this import
 from version import format_version_string, get_version_info
-import pandas as pd
 from log import setup_logging, TkinterHandler
 
 class SheetSelectionDialog:
@@ -162,15 +166,26 @@ class SheetSelectionDialog:
         self.dialog.destroy()
 
 class ExcelToSchemasGUI:
+    EVENT_POLL_MS = 100
+    PREVIEW_PAGE_ROWS = 100
+
     def __init__(self, root, config_manager):
         self.root = root
         self.config_manager = config_manager
         self.config = self.config_manager.config
+        self.workbook = None  # Shared pd.ExcelFile for the current file
+        self.workbook_path = None
+        # Background run state; the worker reports to the GUI only through self.events
+        self.events = queue.Queue()
+        self.worker = None
+        self.cancel_event = None
         self.setup_window()
         self.apply_theme()
         self.create_widgets()  # Create widgets first
         self.setup_logging()   # Then set up logging
         self.load_settings_from_config()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(self.EVENT_POLL_MS, self.process_events)
 
     def load_settings_from_config(self):
         """Load all settings from config file"""
@@ -362,13 +377,22 @@ class ExcelToSchemasGUI:
             style="Primary.TButton"
         ).pack(side="left", padx=5)
         
-        # Right side: Run button
-        ttk.Button(
+        # Right side: Cancel and Run buttons
+        self.cancel_button = ttk.Button(
+            action_bar,
+            text="■ Cancel",
+            command=self.cancel_run,
+            state="disabled"
+        )
+        self.cancel_button.pack(side="right", padx=5)
+        
+        self.run_button = ttk.Button(
             action_bar,
             text="▶ Run Process",
             command=self.run,
             style="Primary.TButton"
-        ).pack(side="right", padx=5)
+        )
+        self.run_button.pack(side="right", padx=5)
         
         # Configure canvas scrolling
         self.main_container.bind(
@@ -527,9 +551,8 @@ Linux/Mac:
         info_label.pack(fill="x", padx=5, pady=5)
         
         # Test connection button
-        ttk.Button(db_frame, text="Test Connection", command=self.test_connection).pack(
-            pady=10
-        )
+        self.test_button = ttk.Button(db_frame, text="Test Connection", command=self.test_connection)
+        self.test_button.pack(pady=10)
 
     def show_driver_help(self):
         help_text = """Common Database Driver Names:
@@ -741,8 +764,12 @@ Release Date: {info['release_date']}
 
     def setup_logging(self):
         """Initialize logging with GUI integration"""
-        gui_handler = TkinterHandler(self.log_display)
-        self.logger = setup_logging(self.config_manager, gui_handler=gui_handler)
+        self.log_handler = TkinterHandler(
+            self.log_display,
+            max_lines=self.config.get('log_display_lines', 1000)
+        )
+        self.logger = setup_logging(self.config_manager, gui_handler=self.log_handler)
+        self.log_handler.start()
 
     def browse_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
@@ -751,12 +778,28 @@ Release Date: {info['release_date']}
             self.file_path_entry.insert(0, file_path)
             self.config['file_path'] = file_path
             self.save_config()
+            self.close_workbook()  # Pick up changes even if the same file was chosen again
             self.update_sheet_list()
 
+    def get_workbook(self):
+        """Return the shared ExcelFile for the current path, reopening only if the path changed"""
+        file_path = self.file_path_entry.get()
+        if self.workbook is None or self.workbook_path != file_path:
+            self.close_workbook()
+            self.workbook = open_workbook(file_path)
+            self.workbook_path = file_path
+        return self.workbook
+
+    def close_workbook(self):
+        if self.workbook is not None:
+            self.workbook.close()
+        self.workbook = None
+        self.workbook_path = None
+
     def update_sheet_list(self):
         try:
-            xls = pd.ExcelFile(self.file_path_entry.get())
-            self.all_sheets = xls.sheet_names
+            # Sheet names come from the cached workbook index, not a full workbook load
+            self.all_sheets = list(read_workbook_index(self.file_path_entry.get()))
             
             # Clear and repopulate sheet list
             self.sheet_list.delete(0, tk.END)
@@ -806,20 +849,30 @@ Release Date: {info['release_date']}
 
     def validate_selected_sheets(self):
         """Validate selected sheets and update status"""
-        if not hasattr(self.config, 'selected_sheets'):
+        if not self.config.get('selected_sheets'):
+            return
+            
+        try:
+            index = read_workbook_index(self.file_path_entry.get())
+        except Exception as e:
+            logging.error(f"Error reading workbook index: {e}")
             return
             
-        def validate_sheet(file_path, sheet_name):
-            """Basic sheet validation"""
-            try:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
-                return not df.empty
-            except Exception:
+        def validate_sheet(sheet_name):
+            """Basic sheet validation from the header row and sheet extent"""
+            info = index.get(sheet_name)
+            if info is None:
+                return False
+            if info['rows'] is None and not info['header']:
+                return True  # Not an .xlsx file; the loader checks it later
+            # rows counts the header row; None means the extent is unknown
+            if info['rows'] is not None and info['rows'] < 2:
                 return False
+            return all(col in info['header'] for col in REQUIRED_COLUMNS)
                 
         invalid_sheets = []
         for sheet in self.config['selected_sheets']:
-            if not validate_sheet(self.file_path_entry.get(), sheet):
+            if not validate_sheet(sheet):
                 invalid_sheets.append(sheet)
                 
         if invalid_sheets:
@@ -839,7 +892,9 @@ Release Date: {info['release_date']}
             return
             
         try:
-            df = pd.read_excel(self.file_path_entry.get(), sheet_name=self.sheet_var.get())
+            # Only the rows that are scrolled into view are ever read
+            header, rows, total = open_sheet_rows(self.get_workbook(), self.sheet_var.get())
+            first_page = list(islice(rows, self.PREVIEW_PAGE_ROWS))
             
             # Create preview window
             preview_window = tk.Toplevel(self.root)
@@ -867,7 +922,7 @@ Release Date: {info['release_date']}
             tree = ttk.Treeview(frame, style="Treeview")
             vsb = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
             hsb = ttk.Scrollbar(frame, orient="horizontal", command=tree.xview)
-            tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+            tree.configure(xscrollcommand=hsb.set)
 
             # Grid layout with borders
             tree.grid(column=0, row=0, sticky='nsew', padx=1, pady=1)
@@ -876,17 +931,19 @@ Release Date: {info['release_date']}
             frame.grid_columnconfigure(0, weight=1)
             frame.grid_rowconfigure(0, weight=1)
 
-            # Configure columns
-            tree["columns"] = list(df.columns)
+            # Configure columns; headers may be blank or repeated, so use positional ids
+            columns = [f"c{i}" for i in range(len(header))]
+            tree["columns"] = columns
             tree["show"] = "headings"
 
             # Set column headings with improved styling
-            for column in df.columns:
-                tree.heading(column, text=column)
-                # Calculate column width based on header and content
+            for i, column in enumerate(columns):
+                title = "" if header[i] is None else str(header[i])
+                tree.heading(column, text=title)
+                # Estimate column width from the header and the first page only
                 max_width = max(
-                    len(str(column)),
-                    df[column].astype(str).str.len().max()
+                    [len(title)] + [len(str(row[i])) for row in first_page
+                                    if i < len(row) and row[i] is not None]
                 )
                 column_width = min(max_width * 10, 300)  # limit width to 300 pixels
                 tree.column(column, width=column_width, minwidth=50)
@@ -899,22 +956,40 @@ Release Date: {info['release_date']}
                      background=[('selected', '#0078d7')],
                      foreground=[('selected', '#ffffff')])
 
-            # Add data rows with alternating colors
-            for idx, row in df.head(100).iterrows():
-                tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-                tree.insert("", "end", values=list(row), tags=(tag,))
-
             # Configure row tags for alternating colors
             tree.tag_configure('oddrow', background='#f0f0f0')
             tree.tag_configure('evenrow', background='#ffffff')
 
             # Add row count label with better styling
-            count_label = ttk.Label(
-                preview_window, 
-                text=f"Showing {min(100, len(df))} of {len(df)} rows",
-                font=('Arial', 10)
-            )
+            count_label = ttk.Label(preview_window, font=('Arial', 10))
             count_label.pack(pady=5)
+
+            state = {'shown': 0, 'more': True}
+
+            def add_rows(page):
+                for row in page:
+                    tag = 'evenrow' if state['shown'] % 2 == 0 else 'oddrow'
+                    values = ["" if v is None else v for v in row]
+                    tree.insert("", "end", values=values, tags=(tag,))
+                    state['shown'] += 1
+                if len(page) < self.PREVIEW_PAGE_ROWS:
+                    state['more'] = False
+                of_total = f" of ~{total}" if total is not None else ""
+                more = "; scroll down for more" if state['more'] else ""
+                count_label.config(text=f"Showing {state['shown']}{of_total} rows{more}")
+
+            def on_scroll(first, last):
+                vsb.set(first, last)
+                # Page in the next rows when the view nears the end of what is loaded
+                if state['more'] and float(last) > 0.9:
+                    try:
+                        add_rows(list(islice(rows, self.PREVIEW_PAGE_ROWS)))
+                    except Exception as e:
+                        state['more'] = False
+                        logging.warning(f"Stopped loading preview rows: {e}")
+
+            add_rows(first_page)
+            tree.configure(yscrollcommand=on_scroll)
             
         except Exception as e:
             messagebox.showerror("Error", f"Error previewing sheet: {str(e)}")
@@ -923,12 +998,28 @@ Release Date: {info['release_date']}
         # Update config with current values
         self.update_config_from_gui()
         
-        # Test connection
-        connection = connect_to_database(self.config['database'])
+        # Retries and login timeouts can take a while, so connect on a worker thread
+        self.test_button.config(state="disabled")
+        self.update_status("Testing database connection...")
+        threading.Thread(
+            target=self._test_connection_worker,
+            args=(dict(self.config['database']), self.config.get('retry_attempts', 1)),
+            daemon=True
+        ).start()
+
+    def _test_connection_worker(self, db_config, retry_attempts):
+        connection = connect_to_database(db_config, retry_attempts=retry_attempts)
         if connection:
-            messagebox.showinfo("Success", "Database connection successful!")
             connection.close()
+        self.post_event('connection', connection is not None)
+
+    def show_connection_result(self, connected):
+        self.test_button.config(state="normal")
+        if connected:
+            self.update_status("Database connection successful!")
+            messagebox.showinfo("Success", "Database connection successful!")
         else:
+            self.update_status("Failed to connect to database")
             messagebox.showerror("Error", "Failed to connect to database")
 
     def update_config_from_gui(self):
@@ -957,6 +1048,9 @@ Release Date: {info['release_date']}
         self.root.update_idletasks()
 
     def run(self):
+        if self.worker is not None and self.worker.is_alive():
+            return
+
         if not self.file_path_entry.get():
             messagebox.showerror("Error", "Please select an Excel file first")
             return
@@ -972,68 +1066,129 @@ Release Date: {info['release_date']}
         self.config['export_type'] = self.export_var.get()
         self.save_config()
         
+        directory = None
+        if self.config['export_type'] == "script":
+            # Dialogs must run on the main thread, so ask before starting the worker
+            directory = filedialog.askdirectory(title="Select Directory for SQL Scripts")
+            if not directory:
+                return
+        
+        self.details_text.delete(1.0, tk.END)
+        self.progress_var.set(0)
+        self.progress_label.config(text="0%")
+        self.update_status("Starting process...")
+        
+        self.cancel_event = threading.Event()
+        self.run_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        # The worker gets its own copy so edits in the GUI cannot change a running job
+        self.worker = threading.Thread(
+            target=self._run_worker,
+            args=(copy.deepcopy(self.config), directory),
+            daemon=True
+        )
+        self.worker.start()
+
+    def _run_worker(self, config, directory):
+        """Body of the background run; reports back only through self.events"""
+        from main import OperationCancelled, run_export
         try:
-            self.details_text.delete(1.0, tk.END)
-            self.update_status("Starting process...")
-            
-            if self.export_var.get() == "script":
-                self.update_status("Generating SQL scripts...", "Reading Excel data...")
-                self.generate_sql_scripts()
+            if config['export_type'] == "script":
+                self.post_event('status', "Generating SQL scripts...", "Reading Excel data...")
+                self.generate_sql_scripts(config, directory)
             else:
-                self.update_status("Importing to database...", "Connecting to database...")
-                from main import main as run_main
-                run_main(progress_callback=self.update_progress)
-            
-            self.update_status("Operation completed successfully!")
-            messagebox.showinfo("Success", "Operation completed successfully!")
-            
+                self.post_event('status', "Importing to database...", "Connecting to database...")
+                run_export(
+                    config,
+                    progress_callback=lambda value: self.post_event('progress', value),
+                    cancel_event=self.cancel_event
+                )
+            self.post_event('done')
+        except OperationCancelled:
+            self.post_event('cancelled')
         except Exception as e:
-            self.update_status("Error occurred!", str(e))
-            messagebox.showerror("Error", str(e))
+            self.post_event('error', str(e))
+
+    def post_event(self, kind, *args):
+        self.events.put((kind,) + args)
 
-    def generate_sql_scripts(self):
-        from main import process_sheets
+    def process_events(self):
+        """Apply events posted by the worker; runs on the Tk main thread"""
+        try:
+            while True:
+                kind, *args = self.events.get_nowait()
+                if kind == 'status':
+                    self.update_status(*args)
+                elif kind == 'progress':
+                    self.update_progress(*args)
+                elif kind == 'connection':
+                    self.show_connection_result(*args)
+                else:
+                    self.finish_run(kind, *args)
+        except queue.Empty:
+            pass
+        self.root.after(self.EVENT_POLL_MS, self.process_events)
+
+    def finish_run(self, outcome, message=None):
+        self.run_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        self.worker = None
+        if outcome == 'done':
+            self.update_status("Operation completed successfully!")
+            messagebox.showinfo("Success", "Operation completed successfully!")
+        elif outcome == 'cancelled':
+            self.update_status("Operation cancelled")
+        else:
+            self.update_status("Error occurred!", message)
+            messagebox.showerror("Error", message)
+
+    def cancel_run(self):
+        """Ask the worker to stop at the next sheet or batch boundary"""
+        if self.cancel_event is not None and self.worker is not None:
+            self.cancel_event.set()
+            self.cancel_button.config(state="disabled")
+            self.update_status("Cancelling...", "Waiting for the current step to finish")
+
+    def on_close(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.close_workbook()
+        self.root.destroy()
+
+    def generate_sql_scripts(self, config, directory):
+        """Write one SQL script per sheet; runs on the worker thread"""
+        from main import check_cancelled, iter_sheet_results
         from validation import generate_schema  # Add this import if you prefer local import
         
-        try:
-            self.update_status("Processing Excel data...")
-            results = process_sheets(self.config)
-            if not results:
-                raise ValueError("No data to process")
+        config = dict(config, cancel_event=self.cancel_event)
+        self.post_event('status', "Processing Excel data...")
+        # Sheets are read one at a time; each is written out before the next is parsed
+        generated = 0
+        for result in iter_sheet_results(config):
+            generated += 1
+            sheet_name = result['sheet_name']
+            self.post_event('status', f"Generating SQL script for {sheet_name}...")
             
-            # Create a directory for SQL scripts
-            directory = filedialog.askdirectory(title="Select Directory for SQL Scripts")
-            if not directory:
-                return
-                
-            for result in results:
-                sheet_name = result['sheet_name']
-                self.update_status(f"Generating SQL script for {sheet_name}...")
-                
-                # Use generate_schema with the correct parameters
-                sql_script = generate_schema(
-                    result['df']  # Pass the DataFrame from the result
-                )
-                
-                output_path = os.path.join(directory, f"{sheet_name}.sql")
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(sql_script)
-                    
-                self.update_status("Success", f"Generated SQL script for {sheet_name}")
-                logging.info(f"SQL script saved to {output_path}")
+            # Use generate_schema with the sheet's parsed TableSpec
+            sql_script = generate_schema(result['spec'])
+            
+            output_path = os.path.join(directory, f"{sheet_name}.sql")
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(sql_script)
                 
-            self.update_status("All SQL scripts generated successfully!")
+            self.post_event('status', "Success", f"Generated SQL script for {sheet_name}")
+            logging.info(f"SQL script saved to {output_path}")
+            check_cancelled(config)
             
-        except Exception as e:
-            self.update_status("Error generating SQL scripts!", str(e))
-            raise
+        if not generated:
+            raise ValueError("No data to process")
+        self.post_event('status', "All SQL scripts generated successfully!")
 
     def update_progress(self, value):
         self.progress_var.set(value)
         self.progress_label.config(text=f"{int(value)}%")
         self.update_status("Processing...", f"Progress: {value:.1f}%")
-        self.root.update_idletasks()
 
     def filter_sheets(self, *args):
         """Filter sheets based on search text"""
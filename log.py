@@ -1,26 +1,98 @@
+import atexit
 import logging
 import os
-from datetime import datetime
+import queue
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import tkinter as tk
 
 class TkinterHandler(logging.Handler):
-    def __init__(self, text_widget):
+    """Write log records to a Tk text widget in batches
+
+    emit() only formats the record and appends it to a buffer, so it is
+    cheap and safe to call from any thread. After start(), the buffer is
+    written on the Tk main thread every flush_ms milliseconds with a single
+    insert, and the widget is trimmed to its last max_lines lines.
+    """
+    def __init__(self, text_widget, max_lines=1000, flush_ms=200):
         logging.Handler.__init__(self)
         self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        # Older lines would be trimmed from the widget anyway
+        self.pending = deque(maxlen=max_lines)
+        self.running = False
 
     def emit(self, record):
-        msg = self.format(record)
+        try:
+            self.pending.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def start(self):
+        """Begin flushing on the Tk event loop; call from the main thread"""
+        self.running = True
+        self.text_widget.after(self.flush_ms, self._tick)
+
+    def _tick(self):
+        if not self.running:
+            return
+        self.write_pending()
+        self.text_widget.after(self.flush_ms, self._tick)
+
+    def write_pending(self):
+        """Insert all buffered lines at once; main thread only"""
+        lines = []
+        while self.pending:
+            lines.append(self.pending.popleft())
+        if not lines:
+            return
         self.text_widget.configure(state='normal')
-        self.text_widget.insert(tk.END, msg + '\n')
+        self.text_widget.insert(tk.END, '\n'.join(lines) + '\n')
+        # The widget always ends with an empty line after the last newline
+        excess = int(self.text_widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.text_widget.delete('1.0', f'{excess + 1}.0')
         self.text_widget.configure(state='disabled')
         self.text_widget.see(tk.END)
 
-def setup_logging(config_manager, gui_handler=None):
-    """Setup logging configuration"""
+    def close(self):
+        self.running = False
+        logging.Handler.close(self)
+
+# Background thread that writes queued records to the real handlers
+_listener = None
+
+def stop_logging():
+    """Stop the listener, writing out any records still queued"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def setup_logging(config_manager, gui_handler=None, log_level=None):
+    """Setup logging configuration
+
+    The root logger only gets a QueueHandler, so a logging call on a hot
+    path just queues the record. A QueueListener thread writes it to the
+    rotating log file, the console and the GUI. Records below log_level
+    (default: config 'log_level') are dropped before they are created.
+    """
+    global _listener
+    config = config_manager.config
+    level = log_level or config.get('log_level', 'INFO')
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    logger.setLevel(level)
 
     # Clear existing handlers
+    stop_logging()
     logger.handlers.clear()
 
     # Create logs directory if it doesn't exist
@@ -28,26 +100,33 @@ def setup_logging(config_manager, gui_handler=None):
     os.makedirs(logs_dir, exist_ok=True)
 
     # Create file handler
-    log_file = os.path.join(logs_dir, f'app_{datetime.now():%Y%m%d_%H%M%S}.log')
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
+    log_file = os.path.join(logs_dir, 'app.log')
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=config.get('log_max_bytes', 5 * 1024 * 1024),
+        backupCount=config.get('log_backup_count', 5),
+        encoding='utf-8'
+    )
 
     # Create console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
 
     # Create formatter
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    handlers = [file_handler, console_handler]
 
     # Add GUI handler if provided
     if gui_handler:
-        gui_handler.setFormatter(formatter)
-        logger.addHandler(gui_handler)
+        handlers.append(gui_handler)
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
 
     return logger
+
+atexit.register(stop_logging)
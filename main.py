@@ -1,10 +1,14 @@
 import os
+import asyncio
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from database import connect_to_database, create_sql_table
-from excel import read_excel_file
-from validation import validate_and_clean_data, map_data_types
+from database import cap_concurrency, check_connection, deploy_table, deploy_tables, is_deployed, log_deploy_summary
+from excel import iter_excel_sheets, read_excel_file
+from cache import open_sheet_cache
+from fingerprint import open_fingerprint_store
+from validation import validate_and_clean_data, build_table_spec
 
 def load_config():
     try:
@@ -22,117 +26,296 @@ def load_config():
         logging.error(f"Error loading configuration: {e}")
         raise
 
+class OperationCancelled(Exception):
+    """Raised when a run is stopped through config['cancel_event']"""
+
+def check_cancelled(config):
+    cancel_event = config.get('cancel_event')
+    if cancel_event is not None and cancel_event.is_set():
+        raise OperationCancelled("Operation cancelled")
+
+def build_sheet_result(sheet_name, df):
+    """Validate and map one parsed sheet; returns None if the sheet is unusable"""
+    if df is None or df.empty:
+        logging.warning(f"No valid data found in sheet: {sheet_name}")
+        return None
+
+    df = validate_and_clean_data(df)
+    if df is None or df.empty:
+        logging.warning(f"Data validation failed for sheet: {sheet_name}")
+        return None
+
+    # แยกวิเคราะห์ชีตครั้งเดียว ทุกตัวสร้าง SQL ใช้ spec นี้ร่วมกัน
+    spec = build_table_spec(df)
+    if spec is None or not spec.columns:
+        logging.warning(f"Failed to map data types for sheet: {sheet_name}")
+        return None
+
+    # Use table name from the spec or fallback to sheet name
+    if not spec.name:
+        logging.warning("ไม่พบชื่อตาราง จะใช้ชื่อชีตแทน")
+    table_name = spec.name or sheet_name.replace(' ', '_')
+
+    return {
+        'sheet_name': sheet_name,
+        'df': df,
+        'spec': spec,
+        'table_name': table_name
+    }
+
 def process_sheets(config):
     """Process multiple sheets and return results"""
     results = []
     
-    df_dict = read_excel_file(config['file_path'])
+    selected_sheets = config.get('selected_sheets', [])
+    # Only parse the sheets that will actually be processed
+    df_dict = read_excel_file(
+        config['file_path'],
+        sheet_names=selected_sheets,
+        streaming=config.get('excel_reader') == 'streaming',
+        workers=config.get('workers') or 1,
+        cache=open_sheet_cache(config)
+    )
     if not df_dict:
         raise ValueError("No valid sheets found in Excel file")
 
-    selected_sheets = config.get('selected_sheets', [])
     if not selected_sheets:
         selected_sheets = [list(df_dict.keys())[0]]
         logging.info(f"No sheets selected, using first available sheet: {selected_sheets[0]}")
 
     total_sheets = len(selected_sheets)
     for i, sheet_name in enumerate(selected_sheets):
+        check_cancelled(config)
         if sheet_name not in df_dict:
             logging.warning(f"Sheet not found or invalid: {sheet_name}")
             continue
 
         logging.info(f"Processing sheet {i+1}/{total_sheets}: {sheet_name}")
-        df = df_dict[sheet_name]
-        
-        if df is None or df.empty:
-            logging.warning(f"No valid data found in sheet: {sheet_name}")
+        result = build_sheet_result(sheet_name, df_dict[sheet_name])
+        if result is None:
             continue
+        results.append(result)
 
-        df = validate_and_clean_data(df)
-        if df is None or df.empty:
-            logging.warning(f"Data validation failed for sheet: {sheet_name}")
-            continue
+        if config.get('progress_callback'):
+            progress = ((i + 1) / total_sheets) * 100
+            config['progress_callback'](progress)
 
-        schema = map_data_types(df)
-        if not schema:
-            logging.warning(f"Failed to map data types for sheet: {sheet_name}")
-            continue
+    return results
 
-        # Get table info
-        from validation import get_table_info
-        table_info = get_table_info(df)
-        if not table_info:
-            logging.warning(f"Failed to get table information for sheet: {sheet_name}")
-            continue
+def iter_sheet_results(config):
+    """Yield the same results as process_sheets, one sheet at a time
 
-        # Use table name from table_info or fallback to sheet name
-        table_name = table_info['name'] or sheet_name.replace(' ', '_')
+    Each sheet is read, validated and mapped only when the caller asks for
+    the next result, so a caller that handles and drops each result keeps
+    one sheet in memory instead of the whole workbook. With workers > 1
+    sheets are parsed in parallel up front and this falls back to
+    process_sheets.
+    """
+    if (config.get('workers') or 1) > 1:
+        yield from process_sheets(config)
+        return
 
-        results.append({
-            'sheet_name': sheet_name,
-            'df': df,
-            'schema': schema,
-            'table_info': table_info,
-            'table_name': table_name
-        })
+    selected_sheets = config.get('selected_sheets', [])
+    sheets = iter_excel_sheets(
+        config['file_path'],
+        sheet_names=selected_sheets,
+        streaming=config.get('excel_reader') == 'streaming',
+        cache=open_sheet_cache(config)
+    )
+    total_sheets = len(selected_sheets) or 1
+    # Only valid sheets are yielded, so count position in the selection, not yields
+    position = 0
+    found = False
+    try:
+        check_cancelled(config)
+        for sheet_name, df in sheets:
+            if selected_sheets:
+                position = selected_sheets.index(sheet_name, position) + 1
+            else:
+                position = 1
+                logging.info(f"No sheets selected, using first available sheet: {sheet_name}")
+            found = True
+            logging.info(f"Processing sheet {position}/{total_sheets}: {sheet_name}")
+            result = build_sheet_result(sheet_name, df)
+            del df
+            if result is not None:
+                yield result
+            if config.get('progress_callback'):
+                progress = (position / total_sheets) * 100
+                config['progress_callback'](progress)
+            if not selected_sheets:
+                break
+            # Stop before the next sheet is read
+            check_cancelled(config)
+    finally:
+        sheets.close()
+    if not found:
+        raise ValueError("No valid sheets found in Excel file")
+    # Invalid or missing sheets at the end of the selection still count as done
+    if position < total_sheets and config.get('progress_callback'):
+        config['progress_callback'](100)
 
-        if config.get('progress_callback'):
-            progress = ((i + 1) / total_sheets) * 100
-            config['progress_callback'](progress)
+async def _produce_sheets(config, queue, executor, consumers):
+    """Parse and map sheets one at a time and feed them to the consumers"""
+    loop = asyncio.get_running_loop()
+    results = iter_sheet_results(config)
+    try:
+        while True:
+            # Advance the generator on the parser thread; None marks the end
+            result = await loop.run_in_executor(executor, next, results, None)
+            if result is None:
+                break
+            # Blocks while the queue is full, which bounds the sheets held in memory
+            await queue.put(result)
+    finally:
+        await loop.run_in_executor(executor, results.close)
+        for _ in range(consumers):
+            await queue.put(None)
 
-    return results
+async def _consume_sheets(config, queue, executor, summary, fingerprints):
+    """Deploy results from the queue until the producer sends None"""
+    loop = asyncio.get_running_loop()
+    db_config = config['database']
+    target = fingerprints.target_key(db_config) if fingerprints is not None else None
+    while True:
+        result = await queue.get()
+        if result is None:
+            return
+        fp = None
+        if fingerprints is not None:
+            fp = fingerprints.fingerprint(result['spec'])
+            if not config.get('force') and fingerprints.get(target, result['table_name']) == fp:
+                summary.append({'table': result['table_name'], 'sheet': result['sheet_name'],
+                                'status': 'skipped', 'seconds': 0.0, 'error': None, 'complete': True})
+                continue
+        # run_pipeline already checked the connection with retries
+        outcome = await loop.run_in_executor(
+            executor, deploy_table, db_config, result,
+            1, config.get('ddl_mode', 'statement'), config.get('cancel_event')
+        )
+        if fp is not None and is_deployed(outcome):
+            fingerprints.record(target, [(result['table_name'], fp)])
+        summary.append(outcome)
 
-def main(progress_callback=None):
+async def _run_pipeline(config, fingerprints):
+    consumers = cap_concurrency(config['database'], config.get('ddl_concurrency'))
+    queue = asyncio.Queue(maxsize=max(1, int(config.get('pipeline_queue_depth') or 1)))
+    summary = []
+    # One parser thread: the sheet generator and its workbook stay on one thread
+    with ThreadPoolExecutor(max_workers=1) as parser, \
+            ThreadPoolExecutor(max_workers=consumers) as deployers:
+        await asyncio.gather(
+            _produce_sheets(config, queue, parser, consumers),
+            *(_consume_sheets(config, queue, deployers, summary, fingerprints)
+              for _ in range(consumers))
+        )
+    return summary
+
+def run_pipeline(config, fingerprints=None):
+    """Parse sheets and create their tables concurrently
+
+    A single producer advances iter_sheet_results on a parser thread while
+    up to ddl_concurrency consumers (capped at pool_size) deploy finished
+    sheets on pooled connections, so parsing overlaps with database I/O and at most
+    pipeline_queue_depth parsed sheets wait in memory. Tables are created in
+    the order their sheets finish parsing, not in foreign key order.
+    Raises ConnectionError before parsing anything when the database cannot
+    be reached. Returns the deploy summary in completion order.
+    """
+    check_connection(config['database'], config.get('retry_attempts', 1))
+    return asyncio.run(_run_pipeline(config, fingerprints))
+
+def without_data(result):
+    """Copy of a sheet result without its DataFrame"""
+    return {key: value for key, value in result.items() if key != 'df'}
+
+def deploy_results(config, results=None):
+    """Create tables for results, or run the parse/deploy pipeline when enabled"""
+    fingerprints = open_fingerprint_store(config)
+    try:
+        if config.get('pipeline'):
+            return run_pipeline(config, fingerprints=fingerprints)
+        return deploy_tables(
+            results,
+            config['database'],
+            concurrency=config.get('ddl_concurrency', 1),
+            retry_attempts=config.get('retry_attempts', 1),
+            ddl_mode=config.get('ddl_mode', 'statement'),
+            batch_max_chars=config.get('ddl_batch_max_chars', 262144),
+            fingerprints=fingerprints,
+            force=config.get('force', False),
+            cancel_event=config.get('cancel_event')
+        )
+    finally:
+        if fingerprints is not None:
+            fingerprints.close()
+
+def run_export(config=None, progress_callback=None, cancel_event=None):
+    """Run an export with config, or with config.json when config is None
+
+    progress_callback receives a percentage after each sheet. Setting
+    cancel_event (a threading.Event) stops the run between sheets and
+    between table batches by raising OperationCancelled.
+    """
     try:
-        config = load_config()
-        validate_config(config)
+        if config is None:
+            config = load_config()
+            validate_config(config)
+
+            # Update to use new logging setup
+            from log import setup_logging
+            from config_manager import ConfigManager
+            setup_logging(ConfigManager(), log_level=config.get('log_level', 'INFO'))
+        else:
+            # Runtime hooks below must not end up in the caller's saved config
+            config = dict(config)
         
         if progress_callback:
             config['progress_callback'] = progress_callback
-
-        # Update to use new logging setup
-        from log import setup_logging
-        setup_logging(
-            log_level=getattr(logging, config.get('log_level', 'INFO'))
-        )
+        if cancel_event is not None:
+            config['cancel_event'] = cancel_event
 
         if not config['file_path']:
             logging.error("No Excel file path specified")
             return
 
         logging.info("Starting the Excel to Schemas project")
-        results = process_sheets(config)
-        
-        if not results:
-            raise ValueError("No sheets were successfully processed")
+        if config.get('export_type') != 'script' and config.get('pipeline'):
+            summary = deploy_results(config)
+            check_cancelled(config)
+            if not summary:
+                raise ValueError("No sheets were successfully processed")
+            log_deploy_summary(summary)
+            if all(item['status'] == 'failed' for item in summary):
+                raise ConnectionError("Failed to create any table in the database")
+            return {'deploy_summary': summary}
 
         if config.get('export_type') == 'script':
             # Generate SQL scripts for all sheets
             from database import generate_sql_script
             scripts = {}
-            for result in results:
-                sql_script = generate_sql_script(
-                    result['table_name'],
-                    result['schema'],
-                    result['table_info'],
-                    result['df']
-                )
+            for result in iter_sheet_results(config):
+                sql_script = generate_sql_script(result['table_name'], result['spec'])
                 scripts[result['sheet_name']] = sql_script
+            if not scripts:
+                raise ValueError("No sheets were successfully processed")
             return {'sql_scripts': scripts}
         else:
+            # Deployment only needs the schemas, so drop each sheet's data as it is mapped
+            results = [without_data(result) for result in iter_sheet_results(config)]
+            if not results:
+                raise ValueError("No sheets were successfully processed")
             # Create tables in database
-            connection = connect_to_database(config['database'])
-            if not connection:
-                raise ConnectionError("Failed to connect to database")
-
-            for result in results:
-                create_sql_table(
-                    connection, 
-                    result['table_name'],
-                    result['schema'],
-                    result['table_info']
-                )
+            summary = deploy_results(config, results)
+            log_deploy_summary(summary)
+            check_cancelled(config)
+            if all(item['status'] == 'failed' for item in summary):
+                raise ConnectionError("Failed to create any table in the database")
+            return {'deploy_summary': summary}
 
+    except OperationCancelled:
+        logging.warning("Export cancelled by user")
+        raise
     except FileNotFoundError as e:
         logging.error(f"File not found: {e}")
         raise
@@ -162,6 +345,7 @@ from config_manager import ConfigManager
 from log import setup_logging
 import logging
 from validation import generate_schema
+import argparse
 import sys
 
 def process_command_line(config_manager):
@@ -174,34 +358,40 @@ def process_command_line(config_manager):
             logging.error("No Excel file path specified in config")
             return 1
             
-        results = process_sheets(config)
-        if not results:
-            logging.error("No sheets were processed")
-            return 1
-            
+        if config.get('export_type') != 'script' and config.get('pipeline'):
+            summary = deploy_results(config)
+            if not summary:
+                logging.error("No sheets were processed")
+                return 1
+            if not log_deploy_summary(summary):
+                logging.error("Some tables could not be created")
+                return 1
+            logging.info("Command line processing completed successfully")
+            return 0
+
         if config.get('export_type') == 'script':
-            for result in results:
+            processed = 0
+            for result in iter_sheet_results(config):
+                processed += 1
                 sheet_name = result['sheet_name']
-                sql_script = generate_schema(result['df'])
+                sql_script = generate_schema(result['spec'])
                 output_path = f"{sheet_name}.sql"
                 
                 with open(output_path, 'w', encoding='utf-8') as f:
                     f.write(sql_script)
                 logging.info(f"Generated SQL script: {output_path}")
+            if not processed:
+                logging.error("No sheets were processed")
+                return 1
         else:
-            connection = connect_to_database(config['database'])
-            if not connection:
-                logging.error("Failed to connect to database")
+            results = [without_data(result) for result in iter_sheet_results(config)]
+            if not results:
+                logging.error("No sheets were processed")
+                return 1
+            summary = deploy_results(config, results)
+            if not log_deploy_summary(summary):
+                logging.error("Some tables could not be created")
                 return 1
-                
-            for result in results:
-                create_sql_table(
-                    connection,
-                    result['table_name'],
-                    result['schema'],
-                    result['table_info']
-                )
-            connection.close()
             logging.info("Command line processing completed successfully")
             
     except Exception as e:
@@ -209,14 +399,33 @@ def process_command_line(config_manager):
         return 1
     return 0
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Excel to Schemas")
+    parser.add_argument('--cli', action='store_true',
+                        help="Skip the GUI and process using the saved configuration")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Re-parse every sheet instead of using the sheet cache")
+    parser.add_argument('--force', action='store_true',
+                        help="Deploy every table even if its schema fingerprint is unchanged")
+    return parser.parse_args(argv)
+
 def main():
     try:
+        args = parse_args()
+
         # Initialize config manager first
         config_manager = ConfigManager()
+        if args.no_cache:
+            config_manager.config['no_cache'] = True
+        if args.force:
+            config_manager.config['force'] = True
         
         # Setup logging with config manager
         logger = setup_logging(config_manager)
         
+        if args.cli:
+            return process_command_line(config_manager)
+
         try:
             root = tk.Tk()
             app = ExcelToSchemasGUI(root, config_manager)
@@ -232,4 +441,6 @@ def main():
     return 0
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # Needed for the worker pool in frozen builds
     sys.exit(main())
\ No newline at end of file
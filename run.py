@@ -24,7 +24,9 @@ def run_cli():
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) > 1 and sys.argv[1] == '--cli':
+    import multiprocessing
+    multiprocessing.freeze_support()  # Needed for the worker pool in frozen builds
+    if '--cli' in sys.argv[1:]:
         run_cli()
     else:
         main()
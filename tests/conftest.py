@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEADER = [
+    'Back', 'Key', 'No', 'Name', 'Nul', 'Type', 'Len', 'Dec', 'Und', 'Def', 'Desc', 'Note',
+    'TableCode', 'TableName', 'TableDesc', 'TableNote'
+]
+
+# ชีตตัวอย่างที่มีช่องว่างใน Key/Nul/Desc/Def, ค่าเริ่มต้นตัวเลข และค่าเริ่มต้นของ BIT
+ORDERS = [
+    (None, 'PK', 1, 'OrderId', 'N', 'int', None, None, None, None, 'รหัสคำสั่งซื้อ', None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, 'FK', 2, 'CustomerId', None, 'int', None, None, None, None, 'ลูกค้า', None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, None, 3, 'Qty', None, 'int', None, None, None, 0, None, None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, None, 4, 'Amount', 'Y', 'decimal', 12, 2, None, 0, 'ยอดรวม', None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, None, 5, 'Active', 'N', 'bit', None, None, None, 'Y', None, None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, None, 6, 'Deleted', None, 'bit', None, None, None, 'N', 'ลบแล้ว', None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, None, 7, 'Status', None, 'nvarchar', 20, None, None, 'NEW', None, None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, None, 8, 'Remark', 'Y', 'nvarchar', None, None, None, None, None, 'ไม่บังคับ', 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, None, 9, 'Ref', None, 'varchar', 15, None, None, None, None, None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+    (None, None, 10, 'CreatedAt', 'N', 'datetime', None, None, None, None, 'วันที่สร้าง', None, 'T01', 'Orders', 'คำสั่งซื้อ', 'หมายเหตุ'),
+]
+
+# ชีตที่ Def มีเฉพาะตัวเลขและช่องว่าง และไม่มี TableDesc/TableNote
+CUSTOMERS = [
+    (None, 'PK', 1, 'CustomerId', 'N', 'bigint', None, None, None, None, 'รหัสลูกค้า', None, 'T02', 'Customers', None, None),
+    (None, None, 2, 'Name', None, 'nvarchar', 100, None, None, None, None, None, 'T02', 'Customers', None, None),
+    (None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None),
+    (None, None, 3, 'Score', 'Y', 'int', 10, None, None, 5, None, None, 'T02', 'Customers', None, None),
+    (None, None, 4, 'Level', None, 'int', None, None, None, 0, 'ระดับ', None, 'T02', 'Customers', None, None),
+]
+
+DATA_SHEETS = ['Orders', 'Customers']
+
+def build_datadict(path):
+    """สร้าง workbook data dictionary ตัวอย่าง: หน้าปก (ชีตไม่ถูกต้อง) ตามด้วย DATA_SHEETS"""
+    wb = Workbook()
+    cover = wb.active
+    cover.title = 'Cover'
+    cover.append(['Data dictionary'])
+    for title, rows in (('Orders', ORDERS), ('Customers', CUSTOMERS)):
+        ws = wb.create_sheet(title)
+        ws.append(HEADER)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+    return path
+
+@pytest.fixture(scope='session')
+def datadict_path(tmp_path_factory):
+    return str(build_datadict(tmp_path_factory.mktemp('datadict') / 'datadict.xlsx'))
@@ -0,0 +1,232 @@
+import pytest
+
+# pyodbc ต้องมี ODBC driver manager (libodbc) จึงจะ import ได้
+pytest.importorskip('pyodbc', exc_type=ImportError)
+
+import database
+from fingerprint import FingerprintStore
+from validation import ColumnSpec, TableSpec
+
+def live_column(data_type, length=None, precision=None, scale=None, nullable=True,
+                description=None, primary_key=False):
+    return {'type': data_type, 'length': length, 'precision': precision, 'scale': scale,
+            'nullable': nullable, 'description': description, 'primary_key': primary_key}
+
+def make_result(table_name, columns, description=''):
+    spec = TableSpec(name=table_name, description=description, columns=columns)
+    return {'table_name': table_name, 'sheet_name': table_name, 'spec': spec}
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql):
+        if self.connection.fail_on and self.connection.fail_on in sql:
+            raise Exception("Cannot insert the value NULL (515)")
+        self.connection.batches.append(sql)
+        return self
+
+    def nextset(self):
+        return False
+
+class FakeConnection:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.batches = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """แทนการเชื่อมต่อฐานข้อมูลด้วย FakeConnection และ catalog ที่กำหนดเอง"""
+    state = {'connection': FakeConnection(), 'catalog': {}}
+    monkeypatch.setattr(database, 'connect_to_database', lambda *a, **k: state['connection'])
+    monkeypatch.setattr(database, 'fetch_live_catalog', lambda connection, names: state['catalog'])
+    return state
+
+def test_diff_adds_not_null_column_without_default_as_null():
+    spec = TableSpec(name='Orders', columns=[
+        ColumnSpec('Id', 'int', nullable=False, key='PK'),
+        ColumnSpec('Code', 'nvarchar', 10, nullable=False),
+    ])
+    live = {'columns': {'Id': live_column('INT', nullable=False, primary_key=True)}, 'description': None}
+    ddl, complete = database.diff_table_ddl('Orders', spec, live)
+    assert ddl == "ALTER TABLE Orders ADD [Code] NVARCHAR(10) NULL;"
+    assert not complete
+
+def test_diff_never_alters_primary_key_columns():
+    spec = TableSpec(name='Orders', columns=[ColumnSpec('Id', 'bigint', nullable=False, key='PK')])
+    live = {'columns': {'id': live_column('INT', nullable=False, primary_key=True)}, 'description': None}
+    assert database.diff_table_ddl('Orders', spec, live) == ('', False)
+
+def test_incremental_deploy_sends_one_table_per_batch(fake_db):
+    results = [make_result(name, [ColumnSpec('Id', 'int', nullable=True)]) for name in ('A', 'B', 'C')]
+    summary = database.deploy_tables(results, {}, ddl_mode='incremental', batch_max_chars=1 << 20)
+    assert [s['status'] for s in summary] == ['created'] * 3
+    assert len(fake_db['connection'].batches) == 3
+
+def test_failing_alter_only_fails_its_own_table(fake_db):
+    fake_db['catalog'] = {
+        'a': {'columns': {'Id': live_column('INT')}, 'description': None},
+        'b': {'columns': {'Id': live_column('INT')}, 'description': None},
+    }
+    fake_db['connection'] = FakeConnection(fail_on='ALTER TABLE A ALTER COLUMN')
+    results = [make_result(name, [ColumnSpec('Id', 'int', nullable=False)]) for name in ('A', 'B')]
+    summary = database.deploy_tables(results, {}, ddl_mode='incremental', batch_max_chars=1 << 20)
+    assert [s['status'] for s in summary] == ['failed', 'created']
+
+def test_partial_incremental_deploy_is_not_fingerprinted(fake_db, tmp_path):
+    fake_db['catalog'] = {'orders': {'columns': {'Id': live_column('INT', nullable=False)}, 'description': None}}
+    full = make_result('Customers', [ColumnSpec('Id', 'int', nullable=False)])
+    partial = make_result('Orders', [ColumnSpec('Id', 'int', nullable=False),
+                                     ColumnSpec('Code', 'nvarchar', 10, nullable=False)])
+    store = FingerprintStore(str(tmp_path / 'fp.sqlite'))
+    try:
+        summary = database.deploy_tables([full, partial], {}, ddl_mode='incremental', fingerprints=store)
+        assert [(s['status'], s['complete']) for s in summary] == [('created', True), ('created', False)]
+        target = store.target_key({})
+        assert store.get(target, 'Customers') == store.fingerprint(full['spec'])
+        assert store.get(target, 'Orders') is None
+    finally:
+        store.close()
+
+def test_concurrency_is_capped_at_pool_size():
+    db_config = {'server': 'cap-test', 'database': 'db', 'pool_size': 3}
+    assert database.cap_concurrency(db_config, 8) == 3
+    assert database.cap_concurrency(db_config, 2) == 2
+    assert database.cap_concurrency(db_config, None) == 1
+
+ORDERS_COLUMNS = [
+    ColumnSpec('OrderId', 'int', nullable=False, description="รหัส 'หลัก'", key='PK'),
+    ColumnSpec('Status', 'nvarchar', 20, default='NEW'),
+    ColumnSpec('Amount', 'decimal', 12, 2, nullable=True),
+]
+
+def orders_spec(description='คำสั่งซื้อ'):
+    return TableSpec(name='Orders', description=description, columns=ORDERS_COLUMNS)
+
+def test_build_create_table_query_adds_primary_key():
+    query = database.build_create_table_query('Orders', orders_spec())
+    assert "[OrderId] INT NOT NULL" in query
+    assert "[Status] NVARCHAR(20) NULL DEFAULT N'NEW'" in query
+    assert "[Amount] DECIMAL(12,2) NULL" in query
+    assert query.rstrip().endswith("CONSTRAINT [PK_Orders] PRIMARY KEY ([OrderId])\n        );")
+
+def test_compile_table_ddl_quotes_descriptions():
+    ddl = database.compile_table_ddl('Order Lines', orders_spec("ของ 'ลูกค้า'"))
+    lines = ddl.split('\n')
+    assert lines[0] == "IF OBJECT_ID('Order_Lines', 'U') IS NOT NULL DROP TABLE Order_Lines;"
+    assert "@value = N'ของ ''ลูกค้า''', @level0type = N'SCHEMA', @level0name = 'dbo', " \
+           "@level1type = N'TABLE', @level1name = N'Order_Lines';" in lines[-2]
+    assert lines[-1].endswith("@level2type = N'COLUMN', @level2name = N'OrderId';")
+    assert "@value = N'รหัส ''หลัก'''" in lines[-1]
+
+def test_generate_sql_script_matches_baseline_layout():
+    script = database.generate_sql_script('Orders', orders_spec())
+    assert script == (
+        "IF OBJECT_ID('Orders', 'U') IS NOT NULL DROP TABLE Orders;\nGO\n\n"
+        "CREATE TABLE [Orders] (\n"
+        "    [OrderId] INT NOT NULL,\n"
+        "    [Status] NVARCHAR(20) NULL DEFAULT N'NEW',\n"
+        "    [Amount] DECIMAL(12,2) NULL\n"
+        ");\nGO\n\n"
+        "EXEC sp_addextendedproperty \n"
+        "@name = N'MS_Description',\n"
+        "@value = N'คำสั่งซื้อ',\n"
+        "@level0type = N'SCHEMA', @level0name = 'dbo',\n"
+        "@level1type = N'TABLE', @level1name = N'Orders';\nGO\n"
+    )
+
+def test_group_ddl_batches_respects_max_chars():
+    items = [('a', 'x' * 40), ('b', 'y' * 40), ('c', 'z' * 100), ('d', 'w' * 10)]
+    groups = database.group_ddl_batches(items, 90)
+    assert [group for group, _ in groups] == [['a', 'b'], ['c'], ['d']]
+    assert groups[0][1] == 'x' * 40 + '\n' + 'y' * 40
+    assert database.group_ddl_batches([], 90) == []
+
+def test_order_by_dependencies_puts_referenced_tables_first():
+    customers = make_result('Customers', [ColumnSpec('CustomerId', 'int', key='PK')])
+    orders = make_result('Orders', [ColumnSpec('OrderId', 'int', key='PK'),
+                                    ColumnSpec('CustomerId', 'int', key='FK')])
+    lines = make_result('Lines', [ColumnSpec('OrderId', 'int', key='FK')])
+    waves = database.order_by_dependencies([lines, orders, customers])
+    assert [[r['table_name'] for r in wave] for wave in waves] == [['Customers'], ['Orders'], ['Lines']]
+
+def test_order_by_dependencies_ignores_shared_key_names():
+    a = make_result('A', [ColumnSpec('ID', 'int', key='PK')])
+    b = make_result('B', [ColumnSpec('ID', 'int', key='PK')])
+    c = make_result('C', [ColumnSpec('ID', 'int', key='FK')])
+    assert [len(wave) for wave in database.order_by_dependencies([a, b, c])] == [3]
+
+def test_order_by_dependencies_deploys_cycles_last():
+    a = make_result('A', [ColumnSpec('AId', 'int', key='PK'), ColumnSpec('BId', 'int', key='FK')])
+    b = make_result('B', [ColumnSpec('BId', 'int', key='PK'), ColumnSpec('AId', 'int', key='FK')])
+    c = make_result('C', [ColumnSpec('CId', 'int', key='PK')])
+    waves = database.order_by_dependencies([a, b, c])
+    assert [[r['table_name'] for r in wave] for wave in waves] == [['C'], ['A', 'B']]
+
+@pytest.mark.parametrize('value, field', [
+    (None, ''),
+    ('', '""'),
+    ('say "hi", ok', '"say ""hi"", ok"'),
+    (True, '1'),
+    (False, '0'),
+    (42, '42'),
+    (1.5, '1.5'),
+])
+def test_csv_field(value, field):
+    assert database._csv_field(value) == field
+
+def test_column_matches_compares_type_size_and_nullability():
+    column = ColumnSpec('Name', 'nvarchar', 50, nullable=True)
+    assert database._column_matches(column, live_column('NVARCHAR', length=50))
+    assert not database._column_matches(column, live_column('NVARCHAR', length=100))
+    assert not database._column_matches(column, live_column('NVARCHAR', length=50, nullable=False))
+    assert database._column_matches(ColumnSpec('Body', 'nvarchar'), live_column('NVARCHAR', length=-1))
+    amount = ColumnSpec('Amount', 'decimal', 12, 2)
+    assert database._column_matches(amount, live_column('DECIMAL', precision=12, scale=2))
+    assert not database._column_matches(amount, live_column('DECIMAL', precision=18, scale=2))
+
+def test_diff_creates_missing_tables():
+    ddl, complete = database.diff_table_ddl('Orders', orders_spec(), None)
+    assert ddl == database.compile_table_ddl('Orders', orders_spec())
+    assert complete
+
+def test_diff_of_unchanged_table_is_empty():
+    live = {
+        'columns': {
+            'orderid': live_column('INT', nullable=False, description="รหัส 'หลัก'", primary_key=True),
+            'STATUS': live_column('NVARCHAR', length=20),
+            'Amount': live_column('DECIMAL', precision=12, scale=2),
+            'Legacy': live_column('INT'),
+        },
+        'description': 'คำสั่งซื้อ',
+    }
+    assert database.diff_table_ddl('Orders', orders_spec(), live) == ('', True)
+
+def test_diff_adds_alters_and_updates_descriptions():
+    live = {
+        'columns': {
+            'OrderId': live_column('INT', nullable=False, description='เดิม', primary_key=True),
+            'Status': live_column('NVARCHAR', length=10),
+        },
+        'description': None,
+    }
+    ddl, complete = database.diff_table_ddl('Orders', orders_spec(), live)
+    assert complete
+    assert ddl.split('\n') == [
+        "EXEC sp_updateextendedproperty @name = N'MS_Description', @value = N'รหัส ''หลัก''', "
+        "@level0type = N'SCHEMA', @level0name = 'dbo', @level1type = N'TABLE', @level1name = N'Orders', "
+        "@level2type = N'COLUMN', @level2name = N'OrderId';",
+        "ALTER TABLE Orders ALTER COLUMN [Status] NVARCHAR(20) NULL;",
+        "ALTER TABLE Orders ADD [Amount] DECIMAL(12,2) NULL;",
+        "EXEC sp_addextendedproperty @name = N'MS_Description', @value = N'คำสั่งซื้อ', "
+        "@level0type = N'SCHEMA', @level0name = 'dbo', @level1type = N'TABLE', @level1name = N'Orders';",
+    ]
@@ -0,0 +1,62 @@
+import pytest
+
+from cache import SheetCache
+from excel import read_excel_file, sheet_cache_keys
+from validation import validate_and_clean_data, build_table_spec
+
+@pytest.fixture(params=[False, True], ids=['pandas', 'streaming'])
+def streaming(request):
+    return request.param
+
+def test_invalid_sheets_are_skipped(datadict_path, streaming):
+    sheets = read_excel_file(datadict_path, streaming=streaming)
+    assert list(sheets) == ['Orders', 'Customers']
+
+def test_blank_cells_stay_missing(datadict_path, streaming):
+    df = read_excel_file(datadict_path, ['Orders'], streaming=streaming)['Orders']
+    for col in ('Key', 'Nul', 'Desc'):
+        values = df[col].astype(object)
+        assert 'None' not in set(values.dropna()), col
+    assert df['Nul'].isna().tolist() == [False, True, True, False, False, True, True, False, True, False]
+    assert df['Desc'].isna().sum() == 5
+
+def test_blank_nul_and_desc_in_spec(datadict_path, streaming):
+    df = read_excel_file(datadict_path, ['Orders'], streaming=streaming)['Orders']
+    spec = build_table_spec(validate_and_clean_data(df))
+    columns = spec.columns_by_name()
+    assert columns['Qty'].nullable is None
+    assert columns['Qty'].sql_nullable
+    assert columns['Qty'].description is None
+    assert columns['Qty'].key is None
+    assert 'Qty' not in spec.column_descriptions
+
+def test_loaders_read_the_same_frame(datadict_path):
+    regular = read_excel_file(datadict_path)
+    streamed = read_excel_file(datadict_path, streaming=True)
+    assert list(regular) == list(streamed)
+    for name, df in regular.items():
+        other = streamed[name]
+        assert df.dtypes.to_dict() == other.dtypes.to_dict()
+        # ค่าว่างในคอลัมน์ object อาจเป็น NaN หรือ None ก็ได้
+        assert df.isna().equals(other.isna())
+        assert df.astype(object).where(df.notna()).equals(other.astype(object).where(other.notna()))
+
+def test_worker_processes_log_through_the_parent(datadict_path, caplog):
+    sheets = read_excel_file(datadict_path, workers=2)
+    assert list(sheets) == ['Orders', 'Customers']
+    assert 'Skipping invalid sheet: Cover' in caplog.messages
+
+def test_cache_keys_only_hash_selected_sheets(datadict_path):
+    all_keys = sheet_cache_keys(datadict_path)
+    assert list(all_keys) == ['Cover', 'Orders', 'Customers']
+    keys = sheet_cache_keys(datadict_path, sheet_names=['Customers', 'Missing'])
+    assert keys == {'Customers': all_keys['Customers']}
+
+def test_cached_selection_matches_uncached_read(datadict_path, tmp_path, streaming):
+    cache = SheetCache(str(tmp_path / 'cache'))
+    expected = read_excel_file(datadict_path, ['Customers'], streaming=streaming)
+    for _ in range(2):
+        sheets = read_excel_file(datadict_path, ['Customers', 'Missing'], streaming=streaming, cache=cache)
+        assert list(sheets) == ['Customers']
+        assert sheets['Customers'].equals(expected['Customers'])
+    assert (cache.misses, cache.hits) == (1, 1)
@@ -0,0 +1,164 @@
+import pytest
+
+from excel import read_excel_file
+from validation import (
+    build_table_spec, generate_schema, get_table_info, map_data_types, validate_and_clean_data
+)
+
+# ผลลัพธ์ของ map_data_types / get_table_info / generate_schema ที่ commit baseline ให้กับ
+# workbook ใน conftest.py (เหมือนกันทั้งบน pandas 2.x และ 3.x) ค่าเหล่านี้รวมพฤติกรรมเดิม
+# ที่ต้องคงไว้ เช่น Def ตัวเลขในคอลัมน์ที่มีช่องว่างเป็น '0.0' และ generate_schema ถือว่า Nul ว่างเป็น NOT NULL
+
+ORDERS_SCHEMA = {
+    'OrderId': 'INT NOT NULL',
+    'CustomerId': 'INT NULL',
+    'Qty': 'INT NULL',
+    'Amount': 'DECIMAL(12,2) NULL',
+    'Active': 'BIT NOT NULL DEFAULT 1',
+    'Deleted': 'BIT NULL DEFAULT 0',
+    'Status': "NVARCHAR(20) NULL DEFAULT N'NEW'",
+    'Remark': 'NVARCHAR(MAX) NULL',
+    'Ref': 'VARCHAR(15) NULL',
+    'CreatedAt': 'DATETIME NOT NULL',
+}
+
+ORDERS_TABLE_INFO = {
+    'code': 'T01',
+    'name': 'Orders',
+    'description': 'คำสั่งซื้อ',
+    'note': 'หมายเหตุ',
+    'primary_keys': ['OrderId'],
+    'foreign_keys': ['CustomerId'],
+}
+
+CUSTOMERS_SCHEMA = {
+    'CustomerId': 'BIGINT NOT NULL',
+    'Name': 'NVARCHAR(100) NULL',
+    'Score': "BIGINT NULL DEFAULT '5.0'",
+    'Level': "INT NULL DEFAULT '0.0'",
+}
+
+CUSTOMERS_TABLE_INFO = {
+    'code': 'T02',
+    'name': 'Customers',
+    'description': '',
+    'note': '',
+    'primary_keys': ['CustomerId'],
+    'foreign_keys': [],
+}
+
+ORDERS_DDL = """\
+CREATE TABLE Orders (
+    [OrderId] INT NOT NULL,
+    [CustomerId] INT NOT NULL,
+    [Qty] INT NOT NULL,
+    [Amount] DECIMAL(12, 2) NULL,
+    [Active] BIT NOT NULL DEFAULT 1,
+    [Deleted] BIT NOT NULL DEFAULT 0,
+    [Status] NVARCHAR(20) NOT NULL DEFAULT 'NEW',
+    [Remark] NVARCHAR NULL,
+    [Ref] VARCHAR(15) NOT NULL,
+    [CreatedAt] DATETIME NOT NULL
+);
+
+EXEC sp_addextendedproperty
+    @name = N'MS_Description',
+    @value = N'รหัสคำสั่งซื้อ',
+    @level0type = N'Schema', @level0name = dbo,
+    @level1type = N'Table', @level1name = Orders,
+    @level2type = N'Column', @level2name = OrderId;
+
+EXEC sp_addextendedproperty
+    @name = N'MS_Description',
+    @value = N'ลูกค้า',
+    @level0type = N'Schema', @level0name = dbo,
+    @level1type = N'Table', @level1name = Orders,
+    @level2type = N'Column', @level2name = CustomerId;
+
+EXEC sp_addextendedproperty
+    @name = N'MS_Description',
+    @value = N'ยอดรวม',
+    @level0type = N'Schema', @level0name = dbo,
+    @level1type = N'Table', @level1name = Orders,
+    @level2type = N'Column', @level2name = Amount;
+
+EXEC sp_addextendedproperty
+    @name = N'MS_Description',
+    @value = N'ลบแล้ว',
+    @level0type = N'Schema', @level0name = dbo,
+    @level1type = N'Table', @level1name = Orders,
+    @level2type = N'Column', @level2name = Deleted;
+
+EXEC sp_addextendedproperty
+    @name = N'MS_Description',
+    @value = N'วันที่สร้าง',
+    @level0type = N'Schema', @level0name = dbo,
+    @level1type = N'Table', @level1name = Orders,
+    @level2type = N'Column', @level2name = CreatedAt;"""
+
+CUSTOMERS_DDL = """\
+CREATE TABLE Customers (
+    [CustomerId] BIGINT NOT NULL,
+    [Name] NVARCHAR(100) NOT NULL,
+    [Score] INT(10) NULL DEFAULT '5.0',
+    [Level] INT NOT NULL DEFAULT '0.0'
+);
+
+EXEC sp_addextendedproperty
+    @name = N'MS_Description',
+    @value = N'รหัสลูกค้า',
+    @level0type = N'Schema', @level0name = dbo,
+    @level1type = N'Table', @level1name = Customers,
+    @level2type = N'Column', @level2name = CustomerId;
+
+EXEC sp_addextendedproperty
+    @name = N'MS_Description',
+    @value = N'ระดับ',
+    @level0type = N'Schema', @level0name = dbo,
+    @level1type = N'Table', @level1name = Customers,
+    @level2type = N'Column', @level2name = Level;"""
+
+EXPECTED = {
+    'Orders': (ORDERS_SCHEMA, ORDERS_TABLE_INFO, ORDERS_DDL),
+    'Customers': (CUSTOMERS_SCHEMA, CUSTOMERS_TABLE_INFO, CUSTOMERS_DDL),
+}
+
+@pytest.fixture(params=[False, True], ids=['pandas', 'streaming'])
+def sheets(request, datadict_path):
+    frames = read_excel_file(datadict_path, streaming=request.param)
+    return {name: validate_and_clean_data(df) for name, df in frames.items()}
+
+@pytest.mark.parametrize('sheet', list(EXPECTED))
+def test_map_data_types_matches_baseline(sheets, sheet):
+    schema = map_data_types(sheets[sheet])
+    assert list(schema.items()) == list(EXPECTED[sheet][0].items())
+
+@pytest.mark.parametrize('sheet', list(EXPECTED))
+def test_get_table_info_matches_baseline(sheets, sheet):
+    info = get_table_info(sheets[sheet])
+    # column_descriptions ถูกเพิ่มหลัง baseline
+    info.pop('column_descriptions')
+    assert info == EXPECTED[sheet][1]
+
+@pytest.mark.parametrize('sheet', list(EXPECTED))
+def test_generate_schema_matches_baseline(sheets, sheet):
+    df = sheets[sheet]
+    assert generate_schema(df) == EXPECTED[sheet][2]
+    assert generate_schema(build_table_spec(df)) == EXPECTED[sheet][2]
+
+def test_column_descriptions_skip_blank_desc(sheets):
+    info = get_table_info(sheets['Orders'])
+    assert info['column_descriptions'] == {
+        'OrderId': 'รหัสคำสั่งซื้อ',
+        'CustomerId': 'ลูกค้า',
+        'Amount': 'ยอดรวม',
+        'Deleted': 'ลบแล้ว',
+        'CreatedAt': 'วันที่สร้าง',
+    }
+
+def test_build_table_spec_reads_blank_cells_as_missing(sheets):
+    columns = build_table_spec(sheets['Customers']).columns_by_name()
+    assert list(columns) == ['CustomerId', 'Name', 'Score', 'Level']
+    level = columns['Level']
+    assert (level.type, level.length, level.nullable, level.key) == ('int', None, None, None)
+    assert columns['Score'].sql_type() == ('BIGINT', None, None)
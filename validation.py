@@ -1,7 +1,7 @@
+import re
 import pandas as pd
 import logging
 import numpy as np
-import re
 from typing import Optional
 
 def error_handling_wrapper(func):
@@ -19,8 +19,10 @@ def validate_and_clean_data(df):
     try:
         logging.info("Starting data validation and cleaning")
         # Use pandas str.strip() instead of applymap
-        for col in df.select_dtypes(include=['object']).columns:
+        for col in df.select_dtypes(include=['object', 'string']).columns:
             df[col] = df[col].str.strip()
+        for col in df.select_dtypes(include=['category']).columns:
+            df[col] = _strip_categories(df[col])
         
         required_columns = ['Key', 'Name', 'Type', 'Len']
         if not all(col in df.columns for col in required_columns):
@@ -34,104 +36,276 @@ def validate_and_clean_data(df):
         logging.error(f"Error validating data: {e}")
         return None
 
+TYPE_MAPPING = {
+    'int': 'INT',
+    'bigint': 'BIGINT',
+    'nvarchar': 'NVARCHAR',
+    'varchar': 'VARCHAR',
+    'nchar': 'NCHAR',
+    'char': 'CHAR',
+    'datetime': 'DATETIME',
+    'decimal': 'DECIMAL',
+    'float': 'FLOAT',
+    'bit': 'BIT'
+}
+
+CHAR_TYPES = ['nvarchar', 'varchar', 'nchar', 'char']
+
+class ColumnSpec:
+    """นิยามของคอลัมน์หนึ่งแถวในชีต data dictionary ที่แยกวิเคราะห์แล้ว
+
+    type เป็นชื่อชนิดตัวพิมพ์เล็ก length/scale เป็น int และค่าที่ไม่ได้ระบุเป็น None
+    nullable เป็น True/False ตาม Nul หรือ None ถ้าไม่ได้ระบุ
+    """
+    __slots__ = ('name', 'type', 'length', 'scale', 'nullable', 'default', 'description', 'key')
+
+    def __init__(self, name, type=None, length=None, scale=None, nullable=None,
+                 default=None, description=None, key=None):
+        self.name = name
+        self.type = type
+        self.length = length
+        self.scale = scale
+        self.nullable = nullable
+        self.default = default
+        self.description = description
+        self.key = key
+
+    def __repr__(self):
+        return f"ColumnSpec({self.name!r}, {self.type!r}, {self.length!r}, {self.scale!r})"
+
+    def sql_type(self):
+        """คืนค่า (ชนิด SQL, ขนาด, scale) ขนาดของชนิดข้อความเป็น int หรือ 'MAX'"""
+        if self.type in CHAR_TYPES:
+            # char: ความยาวต้องมากกว่า 0 มิฉะนั้นใช้ MAX
+            size = self.length if self.length is not None and self.length > 0 else 'MAX'
+            return TYPE_MAPPING[self.type], size, None
+        if self.type == 'decimal':
+            # decimal: ใช้ precision และ scale เริ่มต้นถ้าไม่ได้ระบุ
+            precision = self.length or 18
+            return 'DECIMAL', precision, min(self.scale or 0, precision)
+        if self.type == 'int':
+            # int: ความยาวมากกว่า 9 หลักบ่งบอกถึง bigint
+            return ('BIGINT' if self.length is not None and self.length > 9 else 'INT'), None, None
+        if self.type in TYPE_MAPPING:
+            return TYPE_MAPPING[self.type], None, None
+        return 'NVARCHAR', 'MAX', None
+
+    @property
+    def sql_nullable(self):
+        """คอลัมน์ที่ไม่ได้ระบุ Nul ถือว่าเป็น NULL"""
+        return self.nullable is not False
+
+    def definition(self, with_default=True, nullable=None):
+        """นิยามคอลัมน์ SQL เช่น NVARCHAR(50) NOT NULL DEFAULT N'x'
+
+        ALTER COLUMN เปลี่ยน DEFAULT ไม่ได้ จึงเรียกด้วย with_default=False
+        nullable ใช้แทนค่า sql_nullable ของคอลัมน์เมื่อระบุ
+        """
+        data_type, size, scale = self.sql_type()
+        if scale is not None:
+            text = f"{data_type}({size},{scale})"
+        elif size is not None:
+            text = f"{data_type}({size})"
+        else:
+            text = data_type
+        if nullable is None:
+            nullable = self.sql_nullable
+        text += ' NULL' if nullable else ' NOT NULL'
+
+        # เพิ่มค่าเริ่มต้นถ้าระบุ
+        if with_default and self.default is not None:
+            if self.type in CHAR_TYPES:
+                value = f"N'{self.default}'"
+            elif self.type == 'bit':
+                value = '1' if self.default.upper() == 'Y' else '0'
+            else:
+                value = f"'{self.default}'"
+            text += f" DEFAULT {value}"
+        return text
+
+class TableSpec:
+    """ตารางของชีตหนึ่งชีต สร้างครั้งเดียวโดย build_table_spec
+
+    ทุกตัวสร้าง SQL (map_data_types, generate_schema, DDL, script และการ diff)
+    อ่านจาก TableSpec แทนการแยกวิเคราะห์ DataFrame ซ้ำ
+    """
+    __slots__ = ('code', 'name', 'description', 'note', 'columns')
+
+    def __init__(self, code='', name='', description='', note='', columns=()):
+        self.code = code
+        self.name = name
+        self.description = description
+        self.note = note
+        self.columns = list(columns)
+
+    def __repr__(self):
+        return f"TableSpec({self.name!r}, {len(self.columns)} columns)"
+
+    def columns_by_name(self):
+        """{ชื่อ: ColumnSpec} ถ้าชื่อซ้ำจะใช้แถวหลังสุดในตำแหน่งของแถวแรก"""
+        return {column.name: column for column in self.columns}
+
+    def definitions(self):
+        """{ชื่อคอลัมน์: นิยาม SQL} แบบเดียวกับที่ map_data_types คืนค่า"""
+        return {name: column.definition() for name, column in self.columns_by_name().items()}
+
+    @property
+    def primary_keys(self):
+        return [column.name for column in self.columns if column.key == 'PK']
+
+    @property
+    def foreign_keys(self):
+        return [column.name for column in self.columns if column.key == 'FK']
+
+    @property
+    def column_descriptions(self):
+        """คำอธิบายคอลัมน์สำหรับ MS_Description"""
+        return {column.name: column.description for column in self.columns
+                if column.description is not None}
+
+    def table_info(self):
+        """dict แบบเดียวกับที่ get_table_info คืนค่า"""
+        return {
+            'code': self.code,
+            'name': self.name,
+            'description': self.description,
+            'note': self.note,
+            'primary_keys': self.primary_keys,
+            'foreign_keys': self.foreign_keys,
+            'column_descriptions': self.column_descriptions
+        }
+
+def _strip_categories(series):
+    """str.strip() สำหรับคอลัมน์ category โดย strip เฉพาะ categories แทนทุกแถว"""
+    categories = series.cat.categories
+    if not (categories.dtype == object or isinstance(categories.dtype, pd.StringDtype)):
+        return series
+    stripped = pd.Index(categories.to_series().str.strip())
+    if stripped.hasnans or not stripped.is_unique:
+        # ค่าที่ strip แล้วซ้ำกันหรือไม่ใช่ข้อความ ต้องสร้าง category ใหม่จากค่าจริง
+        return series.astype(object).str.strip().astype('category')
+    return series.cat.rename_categories(stripped)
+
+def _str_column(series):
+    """เทียบเท่ากับการเรียก str(value) กับทุกค่าในคอลัมน์ (NaN -> 'nan')"""
+    return pd.Series(series.to_numpy(dtype=object).astype(str), index=series.index, dtype=object)
+
+def _text_values(series, transform):
+    """เรียก transform กับ _str_column ของคอลัมน์
+
+    ถ้าเป็น category จะเรียก transform กับ categories ครั้งเดียวแล้วกระจายผลตาม codes
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return transform(_str_column(series))
+    # code -1 (ค่าว่าง) ชี้ไปที่ช่องสุดท้ายซึ่งเป็น str(NaN)
+    values = pd.Series(series.cat.categories.tolist() + [np.nan], dtype=object)
+    result = transform(_str_column(values)).to_numpy(dtype=object)
+    return pd.Series(result[series.cat.codes.to_numpy()], index=series.index, dtype=object)
+
+def _int_column(series):
+    """เทียบเท่ากับ int(value) ทั้งคอลัมน์ ค่าว่างจะเป็น NaN"""
+    return np.trunc(pd.to_numeric(series).astype('float64'))
+
+def _present(series, values=None):
+    """list ของ values (ค่าเริ่มต้นคือค่าของ series) โดยแถวที่ series ว่างเป็น None"""
+    values = series.to_numpy(dtype=object) if values is None else np.asarray(values, dtype=object)
+    return np.where(series.isna().to_numpy(), None, values).tolist()
+
+def _int_values(series):
+    """เทียบเท่ากับ int(value) ทั้งคอลัมน์ ค่าว่างเป็น None"""
+    return [None if np.isnan(value) else int(value) for value in _int_column(series).tolist()]
+
+def _first_value(series):
+    """ค่าแรกที่ไม่ว่างของคอลัมน์ หรือ '' ถ้าว่างทั้งคอลัมน์"""
+    present = series.dropna()
+    return present.iloc[0] if len(present) else ''
+
+@error_handling_wrapper
+def build_table_spec(df):
+    """แยกวิเคราะห์ชีตที่ผ่าน validate_and_clean_data เป็น TableSpec
+
+    ค่าแต่ละคอลัมน์ของชีตคำนวณทั้งคอลัมน์พร้อมกัน แล้วจึงประกอบเป็น ColumnSpec ทีละแถว
+    """
+    empty = pd.Series(np.nan, index=df.index, dtype=object)
+    def column(name):
+        return df[name] if name in df.columns else empty
+
+    types, nul, defaults, keys = column('Type'), column('Nul'), column('Def'), column('Key')
+    columns = map(
+        ColumnSpec,
+        _present(column('Name')),
+        _present(types, _text_values(types, lambda text: text.str.lower())),
+        _int_values(column('Len')),
+        _int_values(column('Dec')),
+        _present(nul, _text_values(nul, lambda text: text.str.upper()) == 'Y'),
+        _present(defaults, _str_column(defaults)),
+        _present(column('Desc')),
+        _present(keys, _text_values(keys, lambda text: text.str.upper())),
+    )
+    return TableSpec(
+        code=_first_value(column('TableCode')),
+        name=_first_value(column('TableName')),
+        description=_first_value(column('TableDesc')),
+        note=_first_value(column('TableNote')),
+        columns=columns
+    )
+
 @error_handling_wrapper
 def map_data_types(df):
+    """แมปนิยามคอลัมน์ทั้งชีตเป็นชนิดข้อมูล SQL (ดู ColumnSpec.definition)"""
     logging.info("Starting data type mapping")
-    type_mapping = {
-        'int': 'INT',
-        'bigint': 'BIGINT',
-        'nvarchar': 'NVARCHAR',
-        'varchar': 'VARCHAR',
-        'nchar': 'NCHAR',
-        'char': 'CHAR',
-        'datetime': 'DATETIME',
-        'decimal': 'DECIMAL',
-        'float': 'FLOAT',
-        'bit': 'BIT'
-    }
     
-    schema = {}
-    for _, row in df.iterrows():
-        col_name = row['Name']
-        sql_type = str(row['Type']).lower()
-        length = int(row['Len']) if pd.notnull(row['Len']) else None
-        nullable = row['Nul'].upper() == 'Y' if pd.notnull(row['Nul']) else True
-        
-        # จัดการกรณีประเภท SQL เฉพาะ
-        if sql_type in ['nvarchar', 'varchar', 'nchar', 'char']:
-            # ตรวจสอบให้แน่ใจว่าความยาวถูกต้อง
-            if not length or not isinstance(length, int) or length <= 0:
-                length = 'MAX'
-            type_def = f"{type_mapping[sql_type]}({length})"
-        elif sql_type == 'decimal':
-            # ใช้ precision และ scale เริ่มต้นถ้าไม่ได้ระบุ
-            precision = int(length) if length and isinstance(length, int) else 18
-            scale = int(row['Dec']) if pd.notnull(row.get('Dec')) else 0
-            if scale > precision:
-                scale = precision
-            type_def = f"{type_mapping[sql_type]}({precision},{scale})"
-        elif sql_type == 'int':
-            # ตรวจสอบว่าความยาวบ่งบอกถึง bigint หรือไม่
-            if length and isinstance(length, int) and length > 9:
-                type_def = 'BIGINT'
-            else:
-                type_def = type_mapping[sql_type]
-        else:
-            type_def = type_mapping.get(sql_type, 'NVARCHAR(MAX)')
-        
-        # เพิ่ม nullability
-        type_def += " NULL" if nullable else " NOT NULL"
-        
-        # เพิ่มค่าเริ่มต้นถ้าระบุ
-        if pd.notnull(row.get('Def')):
-            default_value = row['Def']
-            if sql_type in ['nvarchar', 'varchar', 'nchar', 'char']:
-                default_value = f"N'{default_value}'"
-            elif sql_type == 'bit':
-                default_value = '1' if default_value.upper() == 'Y' else '0'
-            else:
-                default_value = f"'{default_value}'"
-            type_def += f" DEFAULT {default_value}"
-            
-        schema[col_name] = type_def
-        logging.debug(f"คอลัมน์ {col_name}: {type_def}")
+    spec = build_table_spec(df)
+    if spec is None:
+        return None
+    schema = spec.definitions()
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for col_name, col_def in schema.items():
+            logging.debug(f"คอลัมน์ {col_name}: {col_def}")
         
     logging.info("การแมปประเภทข้อมูลเสร็จสิ้น")
     return schema
 
 def clean_data_for_sql(df):
-    """ทำความสะอาดและเตรียมข้อมูลสำหรับการแทรก SQL"""
+    """ทำความสะอาดและเตรียมข้อมูลสำหรับการแทรก SQL
+
+    คอลัมน์ float ที่มีแต่ค่าจำนวนเต็มจะถูกแปลงเป็น Int64 ส่วนการแปลง NaN เป็น None
+    ทำครั้งเดียวตอนสร้างแถวใน to_sql_rows
+    """
     logging.info("Starting data cleaning for SQL")
-    for column in df.columns:
-        # แทนที่ NaN ด้วย None สำหรับ SQL NULL
-        df[column] = df[column].replace({np.nan: None})
-        
+    for column in df.columns[(df.dtypes == 'float64').to_numpy()]:
         # แปลงคอลัมน์ float ที่ควรเป็น int
-        if df[column].dtype == 'float64':
-            try:
-                # ตรวจสอบว่าค่าที่ไม่ใช่ null ทั้งหมดเป็นจำนวนเต็มหรือไม่
-                if df[column].dropna().apply(lambda x: float(x).is_integer()).all():
-                    df[column] = df[column].apply(lambda x: int(x) if pd.notnull(x) else None)
-            except:
-                pass
+        values = df[column].to_numpy()
+        present = values[~np.isnan(values)]
+        if np.isfinite(present).all() and (np.mod(present, 1) == 0).all():
+            df[column] = df[column].astype('Int64')
     
     logging.info("Data cleaning for SQL completed successfully")
     return df
 
+def to_sql_rows(df):
+    """แปลง DataFrame เป็น list ของ tuple ของค่า Python สำหรับ pyodbc
+
+    ค่าว่างทุกชนิด (NaN, NaT, pd.NA) จะถูกแทนที่ด้วย None สำหรับ SQL NULL
+    """
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        values = series.to_numpy(dtype=object)
+        missing = series.isna().to_numpy()
+        if missing.any():
+            values = values.copy()
+            values[missing] = None
+        columns.append(values.tolist())
+    return list(zip(*columns))
+
 @error_handling_wrapper
 def get_table_info(df):
     """ดึงข้อมูลตารางจาก DataFrame"""
     try:
         logging.info("Starting to extract table information")
         # รับค่าที่ไม่ใช่ null แรกสำหรับข้อมูลตาราง
-        table_info = {
-            'code': df['TableCode'].iloc[0] if not df['TableCode'].isna().all() else '',
-            'name': df['TableName'].iloc[0] if not df['TableName'].isna().all() else '',
-            'description': df['TableDesc'].iloc[0] if 'TableDesc' in df.columns and not df['TableDesc'].isna().all() else '',
-            'note': df['TableNote'].iloc[0] if 'TableNote' in df.columns and not df['TableNote'].isna().all() else '',
-            'primary_keys': df[df['Key'].str.upper() == 'PK']['Name'].tolist() if not df['Key'].isna().all() else [],
-            'foreign_keys': df[df['Key'].str.upper() == 'FK']['Name'].tolist() if not df['Key'].isna().all() else []
-        }
+        table_info = build_table_spec(df).table_info()
         
         # ตรวจสอบข้อมูลตาราง
         if not table_info['name']:
@@ -141,96 +315,65 @@ def get_table_info(df):
         return table_info
     except Exception as e:
         logging.error(f"เกิดข้อผิดพลาดในการดึงข้อมูลตาราง: {e}")
-        return {
-            'code': '',
-            'name': '',
-            'description': '',
-            'note': '',
-            'primary_keys': [],
-            'foreign_keys': []
-        }
+        return TableSpec().table_info()
 
-def generate_schema(df: pd.DataFrame) -> str:
-    # Columns that are not part of the SQL schema
-    non_sql_columns = ['Back', 'No', 'Dec', 'Und', 'Note', 'TableCode', 'TableDesc', 'TableNote']
-    
-    # Extract table information
-    table_info = {}
-    for _, row in df.iterrows():
-        if pd.notna(row['TableName']) and pd.notna(row['TableCode']):
-            table_info = {
-                'name': row['TableName'],
-                'code': row['TableCode'],
-                'desc': row['TableDesc'] if pd.notna(row['TableDesc']) else ''
-            }
-            break
-
-    # Generate CREATE TABLE statement
-    sql_parts = [f"CREATE TABLE {table_info['name']} ("]
-    
-    # Process columns
-    columns = []
-    type_mapping = {
-        'int': 'INT',
-        'bigint': 'BIGINT',
-        'nvarchar': 'NVARCHAR',
-        'varchar': 'VARCHAR',
-        'nchar': 'NCHAR',
-        'char': 'CHAR',
-        'datetime': 'DATETIME',
-        'decimal': 'DECIMAL',
-        'float': 'FLOAT',
-        'bit': 'BIT'
-    }
-    for _, row in df.iterrows():
-        if pd.isna(row['Name']) or row['Name'] == 'TableName' or row['Name'] in non_sql_columns:
+# Columns that are not part of the SQL schema
+NON_SQL_COLUMNS = ['Back', 'No', 'Dec', 'Und', 'Note', 'TableCode', 'TableDesc', 'TableNote']
+
+NON_IDENTIFIER_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+def generate_schema(spec) -> str:
+    """Build the CREATE TABLE script and column descriptions for one sheet
+
+    spec is the sheet's TableSpec; a DataFrame is parsed with
+    build_table_spec first.
+    """
+    if isinstance(spec, pd.DataFrame):
+        spec = build_table_spec(spec)
+        if spec is None:
+            raise ValueError("Could not parse the sheet")
+    if not spec.name:
+        raise ValueError("Sheet has no TableName")
+    table_name = str(spec.name)
+
+    column_defs = []
+    descriptions = []
+    for column in spec.columns:
+        if column.name is None or column.name == 'TableName' or column.name in NON_SQL_COLUMNS:
             continue
-            
-        column_name = re.sub(r'[^a-zA-Z0-9_]', '', str(row['Name']))
-        sql_type = type_mapping.get(str(row['Type']).lower(), 'NVARCHAR')
-        
+        column_name = NON_IDENTIFIER_CHARS.sub('', str(column.name))
+
         # Parse length and decimal precision
-        if pd.isna(row['Len']) and pd.isna(row['Dec']):
-            sql_type = sql_type
-        elif sql_type.lower() == 'decimal' and not pd.isna(row['Dec']):
-            sql_type = f"{sql_type}({int(row['Len'])}, {int(row['Dec'])})"
-        elif not pd.isna(row['Len']):
-            sql_type = f"{sql_type}({int(row['Len'])})"
-        
-        # Build column definition
-        column_def = [f"[{column_name}]", sql_type]
-        
+        sql_type = TYPE_MAPPING.get(column.type, 'NVARCHAR')
+        if sql_type == 'DECIMAL' and column.scale is not None:
+            if column.length is None:
+                raise ValueError(f"Decimal column {column_name} has a scale but no length")
+            sql_type = f"{sql_type}({column.length}, {column.scale})"
+        elif column.length is not None:
+            sql_type = f"{sql_type}({column.length})"
+
         # Add NULL/NOT NULL constraint
-        is_nullable = str(row['Nul']).upper() == 'Y'
-        column_def.append('NULL' if is_nullable else 'NOT NULL')
-        
+        definition = f"    [{column_name}] {sql_type} {'NULL' if column.nullable else 'NOT NULL'}"
+
         # Handle default value
-        if pd.notna(row['Def']): 
-            default_value = row['Def']
-            if sql_type in ['NVARCHAR', 'VARCHAR', 'NCHAR', 'CHAR']:
-                default_value = f"N'{default_value}'"
+        if column.default is not None:
+            if sql_type in ('NVARCHAR', 'VARCHAR', 'NCHAR', 'CHAR'):
+                definition += f" DEFAULT N'{column.default}'"
             elif sql_type == 'BIT':
-                default_value = '1' if default_value.upper() == 'Y' else '0'
+                definition += f" DEFAULT {'1' if column.default.upper() == 'Y' else '0'}"
             else:
-                default_value = f"'{default_value}'"
-            column_def.append(f"DEFAULT {default_value}")
-        
-        columns.append(f"    {' '.join(column_def)}")
-    
-    # Add columns to SQL
-    sql_parts.append(',\n'.join(columns))
-    
-    sql_parts.append(");")
-    
-    # Add column descriptions
-    for _, row in df.iterrows():
-        if pd.notna(row['Name']) and pd.notna(row['Desc']) and row['Name'] != 'TableName' and row['Name'] not in non_sql_columns:
-            column_name = re.sub(r'[^a-zA-Z0-9_]', '', str(row['Name']))
-            sql_parts.append(f"\nEXEC sp_addextendedproperty")
-            sql_parts.append(f"    @name = N'MS_Description',")
-            sql_parts.append(f"    @value = N'{row['Desc']}',")
-            sql_parts.append(f"    @level0type = N'Schema', @level0name = dbo,")
-            sql_parts.append(f"    @level1type = N'Table', @level1name = {table_info['name']},")
-            sql_parts.append(f"    @level2type = N'Column', @level2name = {column_name};")
-    
-    return '\n'.join(sql_parts)
+                definition += f" DEFAULT '{column.default}'"
+        column_defs.append(definition)
+
+        # Add column descriptions
+        if column.description is not None:
+            descriptions.append(
+                "\nEXEC sp_addextendedproperty\n"
+                "    @name = N'MS_Description',\n"
+                f"    @value = N'{column.description}',\n"
+                "    @level0type = N'Schema', @level0name = dbo,\n"
+                f"    @level1type = N'Table', @level1name = {table_name},\n"
+                f"    @level2type = N'Column', @level2name = {column_name};"
+            )
+
+    return '\n'.join([f"CREATE TABLE {table_name} (", ',\n'.join(column_defs), ");"] + descriptions)